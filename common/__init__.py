@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Building blocks shared by the solvers in this repository.
+
+Solvers living in sub-directories put the repository root on ``sys.path``
+before importing from here, e.g.:
+
+    sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+    from common.instance import parse_input
+"""
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Benchmark: run solvers over a slice of the data directory.
+
+Every run (a solver of ``common.portfolio.SOLVERS`` on an instance) gets a
+fresh process, at most ``workers`` of them at the same time. A run, that is
+not over ``GRACE`` s after its time limit, is terminated; its result is the
+last cover it has passed to its sink, if any. The worker measures the wall
+time and the peak resident memory of the run.
+
+The results go to a CSV file with a row per run:
+
+    solver, instance, status (ok|timeout|error), objective, optimal, feasible
+    (the final cover checked by common/validate.py), wall_time (s), peak_rss_mb,
+    gap (to the best known objective)
+
+The best known objective of an instance is the best one of the validated
+final covers of this benchmark, of the ones of the result files of the earlier
+benchmarks given with ``--best-known`` and of the solution store
+(common/solutions.py) given with ``--store``, so the gaps of solver versions can
+be compared. The runs record their covers in the store,
+but they don't start from it.
+
+Usage: python common/benchmark.py --solvers tabu_001,mm_SA_001 --max-size 1000 --time-limit 30 [--store]
+"""
+import argparse
+import csv
+import fnmatch
+import multiprocessing
+import os
+import re
+import sys
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.cache import load_instance
+from common.portfolio import REGISTRY, ROOT, SOLVERS, run_solver
+from common.solutions import DEFAULT_DIR, SolutionStore, file_key, gap
+from common.validate import check
+
+DATA_ROOT = os.path.join(ROOT, 'data')
+FIELDS = ['solver', 'instance', 'status', 'objective', 'optimal', 'feasible', 'wall_time', 'peak_rss_mb', 'gap']
+# Time a run may take beyond its time limit before it is terminated, in s
+GRACE = 5
+# How often the driver checks the runs, when none has sent anything, in s
+POLL_INTERVAL = 0.1
+
+
+def instance_size(filename):
+    """The item count in the name of the instance, e.g. 1000 for sc_1000_11, None for other files"""
+    match = re.match(r'sc_(\d+)_\d+$', filename)
+    return int(match.group(1)) if match else None
+
+
+def list_instances(min_size=0, max_size=None, pattern='*'):
+    """
+    :param int min_size: the least item count
+    :param int max_size: the greatest item count, None for no limit
+    :param str pattern: a shell pattern of the file names
+    :return list[str]: names of the instances of the data directory, the smallest first
+    """
+    instances = []
+    for filename in os.listdir(DATA_ROOT):
+        size = instance_size(filename)
+        if size is None or size < min_size or (max_size is not None and size > max_size):
+            continue
+        if fnmatch.fnmatch(filename, pattern):
+            instances.append((size, filename))
+    return [filename for size, filename in sorted(instances)]
+
+
+def peak_rss_mb():
+    """The peak resident memory of this process and its waited children in MB, None if unknown"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0  # bytes on macOS, KB elsewhere
+
+
+def _measure(name, path, time_limit, connection, store):
+    """Runs one solver in the worker process, sends ('solution'|'done'|'error', ...) to the connection"""
+    start = time.time()
+    try:
+        sink = lambda obj, solution: connection.send(('solution', obj))
+        # The solver does not get the store: a warm start would spoil the comparison of solver versions
+        obj, is_optimal, solution = run_solver(name, path, time_limit, sink)
+        wall_time, peak = time.time() - start, peak_rss_mb()
+        feasible = None
+        if solution is not None:
+            instance = load_instance(path)
+            feasible = check(instance, solution).feasible
+            if store is not None and feasible:
+                store.record(file_key(path), instance, obj, solution, is_optimal)
+        connection.send(('done', obj, is_optimal, feasible, wall_time, peak))
+    except Exception:
+        sys.stderr.write('{} on {} failed:\n{}'.format(name, path, traceback.format_exc()))
+        connection.send(('error', time.time() - start, peak_rss_mb()))
+
+
+def read_results(path):
+    """:return list[dict]: the rows of a result file"""
+    with open(path) as f:
+        return list(csv.DictReader(f))
+
+
+def best_objectives(rows):
+    """
+    Only the rows, whose final cover has passed common/validate.py, count: the objective of a terminated
+    run is the one it has passed to its sink, and nothing has checked it
+    :param list[dict] rows: of benchmark() or of read_results()
+    :return dict: {instance: the least objective of the feasible rows}
+    """
+    best = {}
+    for row in rows:
+        if row['feasible'] in (True, 'True') and row['objective'] not in ('', None):
+            obj = float(row['objective'])
+            if row['instance'] not in best or obj < best[row['instance']]:
+                best[row['instance']] = obj
+    return best
+
+
+def benchmark(solvers, instances, time_limit=60, workers=None, best_known=None, store=None):
+    """
+    Run every solver on every instance.
+    :param list[str] solvers: keys of common.portfolio.SOLVERS
+    :param list[str] instances: names of files of the data directory
+    :param float time_limit: per run, in s
+    :param int workers: count of runs at the same time (default: one per CPU)
+    :param dict best_known: {instance: objective} of earlier runs
+    :param common.solutions.SolutionStore store: the best known solutions, the runs record theirs
+    :return list[dict]: a row per run, with the FIELDS
+    """
+    workers = workers or multiprocessing.cpu_count()
+    best = dict(best_known or {})
+    if store is not None:
+        # Before the runs record theirs
+        for instance in instances:
+            obj = store.best_objective(file_key(os.path.join(DATA_ROOT, instance)))
+            if obj is not None:
+                best[instance] = min(obj, best.get(instance, obj))
+    tasks = [(name, instance) for instance in instances for name in solvers]
+    rows = [dict(solver=name, instance=instance, status='timeout', objective=None, optimal=None, feasible=None,
+                 wall_time=None, peak_rss_mb=None, gap=None) for name, instance in tasks]
+    running = {}  # {task_id: (process, connection, start time)}
+    next_task = 0
+    try:
+        while next_task < len(tasks) or running:
+            while next_task < len(tasks) and len(running) < workers:
+                name, instance = tasks[next_task]
+                # A pipe per run: terminating a run can break only its own pipe
+                connection, child_connection = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=_measure, args=(
+                    name, os.path.join(DATA_ROOT, instance), time_limit, child_connection, store))
+                process.daemon = True
+                process.start()
+                child_connection.close()  # the child has its copy, EOF on ours means the child is gone
+                running[next_task] = (process, connection, time.time())
+                next_task += 1
+
+            received = False
+            for task_id, (process, connection, start) in list(running.items()):
+                row = rows[task_id]
+                finished = False
+                try:
+                    while connection.poll():
+                        message = connection.recv()
+                        received = True
+                        kind = message[0]
+                        if kind == 'solution':
+                            if row['objective'] is None or message[1] < row['objective']:
+                                row['objective'] = message[1]
+                            continue
+                        if kind == 'done':
+                            obj, row['optimal'], row['feasible'], row['wall_time'], row['peak_rss_mb'] = message[1:]
+                            row['status'] = 'ok'
+                            if obj is not None:
+                                row['objective'] = obj
+                        else:
+                            row['status'] = 'error'
+                            row['wall_time'], row['peak_rss_mb'] = message[1:]
+                        finished = True
+                        break
+                except EOFError:  # died without a message
+                    row['status'] = 'error'
+                    row['wall_time'] = time.time() - start
+                    finished = True
+
+                # Terminate the runs over time
+                over_time = not finished and time.time() > start + time_limit + GRACE
+                if over_time:
+                    process.terminate()
+                    row['wall_time'] = time.time() - start
+                if finished or over_time:
+                    process.join()
+                    connection.close()
+                    del running[task_id]
+            if not received:
+                time.sleep(POLL_INTERVAL)
+    finally:
+        for process, connection, start in running.values():
+            process.terminate()
+            process.join()
+            connection.close()
+
+    for instance, obj in best_objectives(rows).items():
+        best[instance] = min(obj, best.get(instance, obj))
+    for row in rows:
+        row['gap'] = gap(row['objective'], best.get(row['instance']))
+    return rows
+
+
+def write_results(rows, path):
+    with open(path, 'w') as f:
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: '' if row[field] is None else row[field] for field in FIELDS})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run solvers over the instances of the data directory')
+    parser.add_argument('--solvers', default='tabu_001', help='comma separated keys of common.portfolio.SOLVERS')
+    parser.add_argument('--min-size', type=int, default=0, help='the least item count of an instance')
+    parser.add_argument('--max-size', type=int, default=None, help='the greatest item count of an instance')
+    parser.add_argument('--pattern', default='*', help='shell pattern of the instance names, e.g. sc_1000_*')
+    parser.add_argument('--time-limit', type=float, default=60, help='per run, in s')
+    parser.add_argument('--workers', type=int, default=None, help='count of runs at the same time')
+    parser.add_argument('--best-known', action='append', default=[], help='a result file of an earlier benchmark')
+    parser.add_argument('--store', nargs='?', const=DEFAULT_DIR, default=None,
+                        help='directory of the solution store (default: {})'.format(DEFAULT_DIR))
+    parser.add_argument('--output', default='benchmark.csv', help='the result file')
+    args = parser.parse_args(argv)
+
+    solvers = args.solvers.split(',')
+    for name in solvers:
+        if name in REGISTRY and name not in SOLVERS:
+            parser.error('{} does not run under Python {}'.format(name, sys.version_info[0]))
+        if name not in SOLVERS:
+            parser.error('unknown solver {}, one of: {}'.format(name, ', '.join(sorted(SOLVERS))))
+    instances = list_instances(args.min_size, args.max_size, args.pattern)
+    best_known = best_objectives([row for path in args.best_known for row in read_results(path)])
+
+    store = SolutionStore(args.store) if args.store is not None else None
+    rows = benchmark(solvers, instances, args.time_limit, args.workers, best_known, store)
+    write_results(rows, args.output)
+    for row in rows:
+        print('{solver:<16} {instance:<12} {status:<8} {objective!s:>12} {gap!s:>24}'.format(**row))
+
+
+if __name__ == '__main__':
+    main()
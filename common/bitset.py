@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Coverage as bitsets: Python ints where the bit ``i`` stands for the item ``i``.
+
+Python does the bitwise operations on big ints in C, a machine word at a time,
+so union, "is subset" and "all covered" cost a few word operations per 64 items
+instead of a Python loop over the item lists.
+"""
+from binascii import hexlify
+
+
+def items_to_mask(items):
+    """
+    :param iterable[int] items:
+    :return int: mask with the bits of the items set
+    """
+    items = list(items)
+    if not items:
+        return 0
+    buf = bytearray(max(items) // 8 + 1)
+    for item in items:
+        buf[item >> 3] |= 1 << (item & 7)
+    buf.reverse()  # the highest byte goes first for hex
+    return int(hexlify(buf), 16)
+
+
+def full_mask(item_count):
+    return (1 << item_count) - 1
+
+
+def union(masks, solution):
+    """
+    :param list[int] masks: mask of every set
+    :param list[1|0] solution:
+    :return int: mask of the items covered by the chosen sets
+    """
+    covered = 0
+    for mask, taken in zip(masks, solution):
+        if taken:
+            covered |= mask
+    return covered
+
+
+def is_subset(mask, of_mask):
+    return mask & ~of_mask == 0
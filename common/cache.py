@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Binary sidecar cache for parsed instances.
+
+The first load_instance() of a text instance parses it and stores the arrays
+in ``<dir of the instance>/.cache/<name>.csr``. Later loads memory-map that
+file, so even the largest instances are available in milliseconds and no
+per-set Python object is created until somebody asks for it.
+
+Layout of a ``.csr`` file (little endian):
+
+    header   64 bytes: magic, SHA-1 of the source text, item_count, set_count, nnz
+    costs    float64[set_count]
+    offsets  int64[set_count + 1]
+    items    int32[nnz]
+
+The SHA-1 is compared with the source text on every load, so a stale
+sidecar is rebuilt automatically after the instance file was changed.
+"""
+import hashlib
+import os
+import struct
+
+import numpy as np
+
+from common.instance import Instance, parse_input
+
+MAGIC = b'SCCSR\x00\x01\x00'
+HEADER = struct.Struct('<8s20s4xqqq8x')
+CACHE_DIR_NAME = '.cache'
+CACHE_EXT = '.csr'
+
+
+def source_digest(raw):
+    """
+    :param bytes raw: content of the instance file
+    :return bytes: SHA-1 digest identifying the instance
+    """
+    return hashlib.sha1(raw).digest()
+
+
+def sidecar_path(path, cache_dir=None):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    return os.path.join(cache_dir, os.path.basename(path) + CACHE_EXT)
+
+
+def load_instance(path, cache_dir=None):
+    """
+    Load an instance, using (and creating if needed) its binary sidecar.
+    :param str path: text instance file
+    :param str cache_dir: where to keep sidecars; default is ``.cache`` next to the instance
+    :return common.instance.Instance: arrays are read-only memory maps when the sidecar is used
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = source_digest(raw)
+    cache_path = sidecar_path(path, cache_dir)
+
+    instance = read_sidecar(cache_path, digest)
+    if instance is None:
+        instance = parse_input(raw if isinstance(raw, str) else raw.decode('ascii'))
+        try:
+            write_sidecar(cache_path, digest, instance)
+        except (IOError, OSError):
+            pass  # read-only location: the cache is an optimization only
+    return instance
+
+
+def read_sidecar(cache_path, digest=None):
+    """
+    :param str cache_path:
+    :param bytes digest: expected SHA-1 of the source text, None to skip the check
+    :return common.instance.Instance|None: None if there is no valid sidecar
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            header = f.read(HEADER.size)
+    except (IOError, OSError):
+        return None
+    if len(header) != HEADER.size:
+        return None
+    magic, stored_digest, item_count, set_count, nnz = HEADER.unpack(header)
+    if magic != MAGIC or (digest is not None and stored_digest != digest):
+        return None
+
+    expected_size = HEADER.size + 8 * set_count + 8 * (set_count + 1) + 4 * nnz
+    if os.path.getsize(cache_path) != expected_size:
+        return None
+
+    buf = np.memmap(cache_path, dtype=np.uint8, mode='r')
+    start = HEADER.size
+    costs = buf[start:start + 8 * set_count].view('<f8')
+    start += 8 * set_count
+    offsets = buf[start:start + 8 * (set_count + 1)].view('<i8')
+    start += 8 * (set_count + 1)
+    items = buf[start:start + 4 * nnz].view('<i4')
+    return Instance(item_count, set_count, costs, offsets, items)
+
+
+def write_sidecar(cache_path, digest, instance):
+    cache_dir = os.path.dirname(cache_path)
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            if not os.path.isdir(cache_dir):  # somebody else could create it meanwhile
+                raise
+
+    # Write to a temporary file and rename it, so concurrent runs never see a half-written sidecar
+    tmp_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, digest, instance.item_count, instance.set_count, len(instance.items)))
+        f.write(np.ascontiguousarray(instance.costs, dtype='<f8').tobytes())
+        f.write(np.ascontiguousarray(instance.offsets, dtype='<i8').tobytes())
+        f.write(np.ascontiguousarray(instance.items, dtype='<i4').tobytes())
+    try:
+        os.rename(tmp_path, cache_path)
+    except OSError:  # Windows does not replace an existing file
+        os.remove(tmp_path)
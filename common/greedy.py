@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Greedy set cover with lazy evaluation.
+
+Every pick only makes the scores of the remaining sets worse (they can
+only lose not covered items), so a score stored in the heap is an optimistic
+estimate of the actual one. We pop the best entry, re-score that set only,
+and take it if its score has not changed; otherwise we push it back.
+Covering an item touches only the sets that contain it (via the inverted
+index), so the whole run takes O(nnz log(set_count)) instead of re-sorting
+all the sets on every pick.
+"""
+from heapq import heapify, heappop, heappush
+
+from common.instance import transpose
+
+
+def cost_per_item(cost, new_items):
+    """The classic greedy rule: the cheapest price for a newly covered item"""
+    return cost / new_items
+
+
+def lazy_greedy(instance, score=cost_per_item, initial=()):
+    """
+    Pick sets until everything is covered, each time the one with the smallest
+    score (ties go to the lowest set index).
+    :param common.instance.Instance instance:
+    :param function(float, int) -> float score: score of a set from its cost and the count
+        of not covered items it has. Must not decrease when the count decreases.
+    :param list[int] initial: indexes of sets picked before the greedy ones, e.g. a part of a known cover
+    :return list[int]: indexes of the picked sets in the order of picking, the initial ones first
+    """
+    costs = instance.costs.tolist()
+    offsets = instance.offsets.tolist()
+    items = instance.items.tolist()
+    item_offsets, item_sets = (a.tolist() for a in transpose(instance))
+
+    new_items = [offsets[s + 1] - offsets[s] for s in range(instance.set_count)]
+    covered = [False] * instance.item_count
+    not_covered_count = instance.item_count
+
+    def cover(s):
+        """Mark the items of the set covered, return the count of the newly covered ones"""
+        count = 0
+        for item in items[offsets[s]:offsets[s + 1]]:
+            if not covered[item]:
+                covered[item] = True
+                count += 1
+                for other in item_sets[item_offsets[item]:item_offsets[item + 1]]:
+                    new_items[other] -= 1
+        return count
+
+    picked = list(initial)
+    for s in picked:
+        not_covered_count -= cover(s)
+
+    heap = [(score(costs[s], n), s) for s, n in enumerate(new_items) if n > 0]
+    heapify(heap)
+
+    while heap and not_covered_count > 0:
+        stored_score, s = heappop(heap)
+        n = new_items[s]
+        if n == 0:
+            continue  # useless now
+        actual_score = score(costs[s], n)
+        if actual_score > stored_score:
+            heappush(heap, (actual_score, s))  # stale entry: re-score and try again
+            continue
+
+        picked.append(s)
+        not_covered_count -= cover(s)
+    return picked
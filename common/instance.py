@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Columnar (CSR) representation of a set cover instance.
+
+The instance is kept in three flat NumPy arrays instead of a list of
+``Set`` tuples:
+
+* ``costs[j]``    -- cost of the set ``j``
+* ``offsets[j]``  -- position of the first item of the set ``j`` in ``items``
+                     (``offsets`` has ``set_count + 1`` entries)
+* ``items``       -- item indexes of all sets, one set after another
+
+So the items of the set ``j`` are ``items[offsets[j]:offsets[j + 1]]``.
+Legacy code that wants ``Set`` tuples can get them with ``to_sets()``.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+Set = namedtuple("Set", ['index', 'cost', 'items'])
+Instance = namedtuple('Instance', ['item_count', 'set_count', 'costs', 'offsets', 'items'])
+
+COST_DTYPE = np.float64
+OFFSET_DTYPE = np.int64
+ITEM_DTYPE = np.int32
+
+
+def parse_input(input_data):
+    """
+    Parse the text of an instance in one pass over its tokens.
+
+    Lines after the ``set_count``-th set are ignored.
+    :param str input_data: content of a file from the data directory
+    :return Instance:
+    """
+    lines = input_data.split('\n')
+
+    parts = lines[0].split()
+    item_count = int(parts[0])
+    set_count = int(parts[1])
+
+    # Collect all the tokens as strings and convert them with a single NumPy call:
+    # this is much cheaper than int()/float() on every token.
+    tokens = []
+    lengths = np.empty(set_count, dtype=OFFSET_DTYPE)
+    for idx, line in enumerate(lines[1:set_count+1]):
+        parts = line.split()
+        lengths[idx] = len(parts)
+        tokens.extend(parts)
+    values = np.array(tokens, dtype=COST_DTYPE)
+
+    is_cost = np.zeros(len(values), dtype=bool)
+    is_cost[np.cumsum(lengths) - lengths] = True
+
+    offsets = np.zeros(set_count + 1, dtype=OFFSET_DTYPE)
+    np.cumsum(lengths - 1, out=offsets[1:])
+
+    return Instance(item_count, set_count,
+                    values[is_cost],
+                    offsets,
+                    values[~is_cost].astype(ITEM_DTYPE))
+
+
+def read_instance(path):
+    with open(path) as f:
+        return parse_input(f.read())
+
+
+def set_items(instance, set_idx):
+    """
+    :param Instance instance:
+    :param int set_idx:
+    :return np.ndarray: items of the set (a view, not a copy)
+    """
+    return instance.items[instance.offsets[set_idx]:instance.offsets[set_idx + 1]]
+
+
+def set_sizes(instance):
+    return np.diff(instance.offsets)
+
+
+def transpose(instance):
+    """
+    Build the inverted item -> sets index in the same CSR form.
+    :param Instance instance:
+    :return (np.ndarray, np.ndarray): ``offsets`` and ``sets``, so the sets covering
+        the item ``i`` are ``sets[offsets[i]:offsets[i + 1]]`` (in increasing order)
+    """
+    owners = np.repeat(np.arange(instance.set_count, dtype=ITEM_DTYPE), set_sizes(instance))
+    order = np.argsort(instance.items, kind='mergesort')  # stable: keeps sets of an item sorted
+
+    offsets = np.zeros(instance.item_count + 1, dtype=OFFSET_DTYPE)
+    np.cumsum(np.bincount(instance.items, minlength=instance.item_count), out=offsets[1:])
+    return offsets, owners[order]
+
+
+def to_sets(instance):
+    """
+    Adapter for the code that works with the list of ``Set`` tuples.
+    :param Instance instance:
+    :return list[Set]: items of every set are a list of int
+    """
+    costs = instance.costs.tolist()
+    offsets = instance.offsets.tolist()
+    items = instance.items.tolist()
+    return [Set(idx, costs[idx], items[offsets[idx]:offsets[idx+1]])
+            for idx in range(instance.set_count)]
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Tabu search, that improves a feasible cover.
+
+A step drops a chosen set and repairs the cover: every item left uncovered
+gets the cheapest set per newly covered item among its candidates. Sets that
+become redundant are dropped for free. A dropped set may not come back and an
+added set may not be dropped for ``tenure`` steps, so the search does not
+cycle, and it accepts worse covers to leave a local optimum.
+
+The state keeps per item the count of chosen sets covering it and the XOR of
+their indexes: if the count is 1, the XOR is the only set covering the item.
+With them each chosen set has the count of items only it covers (``unique``),
+and a drop, an add or the score of a set all take time proportional to the
+size of the set.
+"""
+import random
+import time
+
+from common.instance import transpose
+
+# Count of chosen sets sampled to pick the set to drop
+DROP_SAMPLE = 8
+# A dropped/added set is tabu for TENURE + randrange(TENURE) steps
+TENURE = 10
+# Go back to the best cover after this many steps without improvement
+RESTART_AFTER = 2000
+
+
+class TabuSearch(object):
+    def __init__(self, instance, solution, seed=None):
+        """
+        :param common.instance.Instance instance:
+        :param list[1|0] solution: a feasible cover
+        :param seed: seed of the random generator
+        """
+        self.set_count = instance.set_count
+        self.costs = instance.costs.tolist()
+        self.offsets = instance.offsets.tolist()
+        self.items = instance.items.tolist()
+        self.item_offsets, self.item_sets = (a.tolist() for a in transpose(instance))
+        self.rng = random.Random(seed)
+
+        self.selected = [False] * self.set_count
+        self.chosen = []  # the selected sets, for a random choice in O(1)
+        self.position = [-1] * self.set_count  # index of a set in chosen
+        self.unique = [0] * self.set_count  # count of items covered only by the set
+        self.cover_count = [0] * instance.item_count
+        self.owners = [0] * instance.item_count  # XOR of the chosen sets covering the item
+        self.cost = 0
+        self.tabu_until = [0] * self.set_count  # step until which the set may not be moved
+        self.step = 0
+        for s, x in enumerate(solution):
+            if x:
+                self.add(s)
+        if any(count == 0 for count in self.cover_count):
+            raise ValueError('the solution is not a cover')
+
+    def set_items(self, s):
+        return self.items[self.offsets[s]:self.offsets[s + 1]]
+
+    def add(self, s):
+        """Choose the set s, return the sets, that became redundant"""
+        cover_count, owners, unique = self.cover_count, self.owners, self.unique
+        redundant = []
+        for i in self.set_items(s):
+            count = cover_count[i]
+            if count == 0:
+                unique[s] += 1
+            elif count == 1:
+                other = owners[i]
+                unique[other] -= 1
+                if unique[other] == 0:
+                    redundant.append(other)
+            cover_count[i] = count + 1
+            owners[i] ^= s
+        self.cost += self.costs[s]
+        self.position[s] = len(self.chosen)
+        self.chosen.append(s)
+        self.selected[s] = True
+        return redundant
+
+    def drop(self, s):
+        """Remove the set s, return the items, that became uncovered"""
+        cover_count, owners, unique = self.cover_count, self.owners, self.unique
+        uncovered = []
+        for i in self.set_items(s):
+            owners[i] ^= s
+            count = cover_count[i] - 1
+            cover_count[i] = count
+            if count == 0:
+                uncovered.append(i)
+            elif count == 1:
+                unique[owners[i]] += 1
+        unique[s] = 0
+        self.cost -= self.costs[s]
+        # Remove from chosen: move the last one to its place
+        last = self.chosen.pop()
+        if last != s:
+            self.chosen[self.position[s]] = last
+            self.position[last] = self.position[s]
+        self.position[s] = -1
+        self.selected[s] = False
+        return uncovered
+
+    def new_items(self, s):
+        """Count of not covered items of the set s"""
+        cover_count = self.cover_count
+        return sum(1 for i in self.set_items(s) if cover_count[i] == 0)
+
+    def drop_redundant(self, candidates):
+        """Drop the candidates, that are still chosen and redundant, the most expensive first"""
+        for s in sorted(candidates, key=lambda s: -self.costs[s]):
+            if self.selected[s] and self.unique[s] == 0:
+                self.drop(s)
+
+    def pick_drop(self):
+        """The set with the highest cost per uniquely covered item among a sample of the not tabu chosen sets"""
+        rng, chosen = self.rng, self.chosen
+        best, best_score = None, None
+        for _ in range(DROP_SAMPLE):
+            s = chosen[rng.randrange(len(chosen))]
+            if self.tabu_until[s] > self.step:
+                continue
+            score = self.costs[s] / self.unique[s]
+            if best is None or score > best_score:
+                best, best_score = s, score
+        return best
+
+    def pick_add(self, item):
+        """The cheapest set per newly covered item among the not tabu sets covering the item"""
+        best, best_score = None, None
+        best_tabu, best_tabu_score = None, None
+        for s in self.item_sets[self.item_offsets[item]:self.item_offsets[item + 1]]:
+            score = self.costs[s] / self.new_items(s)
+            if self.tabu_until[s] > self.step:
+                if best_tabu is None or score < best_tabu_score:
+                    best_tabu, best_tabu_score = s, score
+            elif best is None or score < best_score:
+                best, best_score = s, score
+        # All the candidates are tabu: take the best one anyway, the cover must be repaired
+        return best if best is not None else best_tabu
+
+    def move(self):
+        """One step: drop a set, repair the cover, drop the redundant sets"""
+        self.step += 1
+        out_set = self.pick_drop()
+        if out_set is None:
+            return
+        self.tabu_until[out_set] = self.step + TENURE + self.rng.randrange(TENURE)
+        redundant = []
+        for i in self.drop(out_set):
+            if self.cover_count[i] == 0:
+                in_set = self.pick_add(i)
+                self.tabu_until[in_set] = self.step + TENURE + self.rng.randrange(TENURE)
+                redundant.extend(self.add(in_set))
+        self.drop_redundant(redundant)
+
+    def reset(self, solution):
+        """Go back to the cover"""
+        for s, x in enumerate(solution):
+            if self.selected[s] and not x:
+                self.drop(s)
+        for s, x in enumerate(solution):
+            if x and not self.selected[s]:
+                self.add(s)
+
+    def run(self, time_limit, sink=None):
+        """
+        Improve the cover until the time is over.
+        :param float time_limit: in s
+        :param sink: callable(obj, solution), gets the improving covers (see common/sinks.py)
+        :return (float, list[1|0]): cost of the best cover found and the cover
+        """
+        deadline = time.time() + time_limit
+        self.drop_redundant(list(self.chosen))
+        best_cost, best_solution = self.cost, [int(x) for x in self.selected]
+        last_improvement = self.step
+        while self.chosen and time.time() < deadline:
+            improved = False
+            for _ in range(100):  # check the clock once per 100 steps
+                self.move()
+                if self.cost < best_cost:
+                    best_cost, best_solution = self.cost, [int(x) for x in self.selected]
+                    last_improvement = self.step
+                    improved = True
+            if improved and sink is not None:
+                sink(best_cost, best_solution)
+            if self.step - last_improvement > RESTART_AFTER:
+                self.reset(best_solution)
+                last_improvement = self.step
+        return best_cost, best_solution
+
+
+def improve(instance, solution, time_limit=60, seed=None, sink=None):
+    """
+    Improve a feasible cover by tabu search.
+    :param common.instance.Instance instance:
+    :param list[1|0] solution: a feasible cover
+    :param float time_limit: in s
+    :param seed: seed of the random generator
+    :param sink: callable(obj, solution), gets the improving covers (see common/sinks.py)
+    :return (float, list[1|0]): cost and the best cover, it is not worse than the given one
+    """
+    return TabuSearch(instance, solution, seed).run(time_limit, sink)
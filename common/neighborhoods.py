@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Neighborhoods for large neighborhood search.
+
+A neighborhood of a cover is the set of sets, that the sub-problem may
+change: the chosen sets and a part of the unused ones (free sets). All the
+other unused sets are excluded (fixed to 0). Uniformly random free sets
+rarely contain a better combination, so there are structured operators:
+
+* ``random``       -- free sets chosen uniformly at random
+* ``item_region``  -- free sets around a random item: the sets covering it,
+                      the sets covering their items and so on
+* ``reduced_cost`` -- free the sets with the smallest Lagrangian reduced
+                      cost (an estimation of the LP one), with some noise.
+                      The reduced costs are recomputed, when the incumbent
+                      has improved, at most every REFRESH_CALLS calls
+* ``overlap``      -- free the sets, that share items with a random chosen set
+
+AdaptiveNeighborhoods picks an operator with probability proportional to its
+recent success rate, so the search spends its time on the operators that
+work on the instance.
+"""
+import random
+from collections import deque
+
+import numpy as np
+
+from common.instance import set_sizes, transpose
+
+OPERATORS = ['random', 'item_region', 'reduced_cost', 'overlap']
+# Weight of the last result in the success rate of an operator
+REACTION = 0.1
+# The least weight of an operator, so that every operator is tried from time to time
+MIN_WEIGHT = 0.05
+# How many sets of the best ranked ones are candidates for the reduced_cost operator
+RANK_SPREAD = 2
+# The least count of calls of the reduced_cost operator between two computations of the reduced costs
+REFRESH_CALLS = 10
+
+
+def lagrangian_reduced_costs(instance, upper_bound, iterations=200):
+    """
+    Reduced costs c_j - sum(u_i for i in j) for the multipliers of the Lagrangian
+    relaxation of the cover constraints, found by the subgradient method.
+    They estimate the LP reduced costs: sets with small ones are likely in good covers.
+    :param common.instance.Instance instance:
+    :param float upper_bound: cost of a known cover, it defines the step
+    :param int iterations:
+    :return np.ndarray:
+    """
+    sizes = set_sizes(instance)
+    sets = np.repeat(np.arange(instance.set_count), sizes)
+    items = np.asarray(instance.items)
+    costs = np.asarray(instance.costs, dtype=float)
+
+    multipliers = np.full(instance.item_count, np.inf)
+    np.minimum.at(multipliers, items, (costs / np.maximum(sizes, 1))[sets])
+    multipliers[np.isinf(multipliers)] = 0.0
+
+    best_bound, best_reduced_costs = -np.inf, None
+    scale = 2.0
+    for _ in range(iterations):
+        reduced_costs = costs - np.bincount(sets, weights=multipliers[items], minlength=instance.set_count)
+        chosen = reduced_costs < 0
+        bound = multipliers.sum() + reduced_costs[chosen].sum()
+        if bound > best_bound:
+            best_bound, best_reduced_costs = bound, reduced_costs
+        else:
+            scale /= 1.05
+        gradient = 1.0 - np.bincount(items[chosen[sets]], minlength=instance.item_count)
+        gradient[(multipliers <= 0) & (gradient < 0)] = 0.0
+        norm = gradient.dot(gradient)
+        if norm == 0 or bound >= upper_bound:
+            break
+        multipliers = np.maximum(multipliers + scale * (upper_bound - bound) / norm * gradient, 0.0)
+    return best_reduced_costs
+
+
+class AdaptiveNeighborhoods(object):
+    def __init__(self, instance, upper_bound=None, operators=OPERATORS, seed=None):
+        """
+        :param common.instance.Instance instance:
+        :param float upper_bound: cost of a known cover for the reduced_cost operator, the cost of the incumbent
+            is used, if it is lower
+        :param list[str] operators: names of the operators to use
+        :param seed: seed of the random generator
+        """
+        self.instance = instance
+        self.upper_bound = upper_bound
+        self.item_offsets, self.item_sets = transpose(instance)
+        self.rng = random.Random(seed)
+        self.weights = {name: 1.0 for name in operators}
+        self.metrics = {name: [0, 0] for name in operators}  # {name: [calls, improvements]}
+        self._reduced_costs = None
+        self._reduced_costs_bound = None  # the upper bound, that they were computed with
+        self._reduced_costs_age = 0       # calls of the operator since then
+
+    def draw(self, solution, free_count):
+        """
+        Choose an operator by the weights and make a neighborhood of the solution.
+        :param list[1|0] solution: the incumbent
+        :param int free_count: count of unused sets to free
+        :return (str, list[int]): name of the operator (for update()) and the indexes of the excluded sets
+        """
+        names = sorted(self.weights)
+        point = self.rng.random() * sum(self.weights[name] for name in names)
+        for name in names:
+            point -= self.weights[name]
+            if point < 0:
+                break
+        return name, self.neighborhood(name, solution, free_count)
+
+    def update(self, name, improved):
+        """Report whether the sub-problem of the neighborhood made by the operator improved the incumbent"""
+        self.weights[name] = max(MIN_WEIGHT, (1 - REACTION) * self.weights[name] + REACTION * float(improved))
+        self.metrics[name][0] += 1
+        self.metrics[name][1] += int(improved)
+
+    def neighborhood(self, name, solution, free_count):
+        """
+        :return list[int]: the indexes of the excluded sets
+        """
+        solution = np.asarray(solution)
+        unused = np.flatnonzero(solution == 0)
+        free_count = min(free_count, len(unused))
+        free = getattr(self, '_free_by_' + name)(solution, unused, free_count)
+        excluded = np.ones(self.instance.set_count, dtype=bool)
+        excluded[free] = False
+        excluded[solution != 0] = False
+        return np.flatnonzero(excluded).tolist()
+
+    # Operators: every one returns the indexes of the unused sets to free
+
+    def _free_by_random(self, solution, unused, free_count):
+        return self.rng.sample(unused.tolist(), free_count)
+
+    def _free_by_item_region(self, solution, unused, free_count):
+        # Breadth-first search over the items from a random one, through the sets, that cover them
+        instance = self.instance
+        if instance.item_count == 0:  # e.g. everything is fixed by the presolve, there is no region
+            return self._free_by_random(solution, unused, free_count)
+        start = self.rng.randrange(instance.item_count)
+        queue = deque([start])
+        seen_items = {start}
+        free = []
+        seen_sets = set()
+        while queue and len(free) < free_count:
+            item = queue.popleft()
+            for s in self.item_sets[self.item_offsets[item]:self.item_offsets[item + 1]].tolist():
+                if s in seen_sets:
+                    continue
+                seen_sets.add(s)
+                if solution[s] == 0:
+                    free.append(s)
+                for other in instance.items[instance.offsets[s]:instance.offsets[s + 1]].tolist():
+                    if other not in seen_items:
+                        seen_items.add(other)
+                        queue.append(other)
+        return free[:free_count]
+
+    def _free_by_reduced_cost(self, solution, unused, free_count):
+        # A better incumbent gives a tighter bound, so better multipliers
+        upper_bound = float(np.asarray(self.instance.costs)[solution != 0].sum())
+        if self.upper_bound is not None:
+            upper_bound = min(upper_bound, self.upper_bound)
+        self._reduced_costs_age += 1
+        if self._reduced_costs is None or \
+                (upper_bound < self._reduced_costs_bound and self._reduced_costs_age >= REFRESH_CALLS):
+            self._reduced_costs = lagrangian_reduced_costs(self.instance, upper_bound)
+            self._reduced_costs_bound, self._reduced_costs_age = upper_bound, 0
+        ranked = unused[np.argsort(self._reduced_costs[unused], kind='mergesort')]
+        return self.rng.sample(ranked[:RANK_SPREAD * free_count].tolist(), free_count)
+
+    def _free_by_overlap(self, solution, unused, free_count):
+        # The sets sharing items with random chosen sets, until there are enough of them
+        instance = self.instance
+        chosen = np.flatnonzero(solution).tolist()
+        self.rng.shuffle(chosen)
+        free = []
+        seen_sets = set()
+        for s in chosen:
+            items = instance.items[instance.offsets[s]:instance.offsets[s + 1]]
+            if len(items) == 0:
+                continue  # shares nothing
+            sharing = np.concatenate([self.item_sets[self.item_offsets[i]:self.item_offsets[i + 1]] for i in items])
+            for other in np.unique(sharing).tolist():
+                if other not in seen_sets and solution[other] == 0:
+                    seen_sets.add(other)
+                    free.append(other)
+            if len(free) >= free_count:
+                break
+        if len(free) > free_count:
+            free = self.rng.sample(free, free_count)
+        return free
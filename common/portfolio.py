@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Portfolio: race several solvers of this repository on one instance.
+
+Every solver runs in its own process, in its own directory (the solvers
+import their sibling modules and some write files next to them), under a
+shared deadline. The improving covers of the solvers with a ``sink``
+argument and the final answers of all of them go to the driver through a
+queue, the driver keeps the best one (and records it in the solution store,
+if it is given). A proven optimum stops the race; at the deadline the solvers
+still running are terminated.
+
+A solver is registered in ``REGISTRY`` by its directory, module and function,
+by the arguments the function takes and by the major versions of Python, that
+it runs on (some old solvers are Python 2 only). ``SOLVERS`` are the ones, that
+run under the interpreter of the portfolio. The arguments are:
+
+* ``input_data`` -- the content of the instance file
+* ``path``       -- the path of the instance file
+* ``time_limit`` -- the time left in s
+* ``timeout``    -- the same, as int
+* ``sink``       -- callable(obj, solution) for the improving covers
+* ``store``      -- a common.solutions.SolutionStore to start from, or None
+
+The function returns the output format (``solve_it()``), or a pair of the
+cost and the solution (a triple with the optimality flag), or None.
+"""
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from collections import namedtuple
+
+try:
+    from queue import Empty
+except ImportError:  # Python 2
+    from Queue import Empty
+
+from common.cache import load_instance
+from common.solutions import file_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+Solver = namedtuple('Solver', ['directory', 'module', 'function', 'arguments', 'pythons'])
+PY2 = (2,)
+ANY_PYTHON = (2, 3)
+REGISTRY = {
+    'greedy_001': Solver('greedy_001', 'solver', 'solve_it', ('input_data',), PY2),
+    'greedy_002': Solver('greedy_002', 'solver', 'solve_it', ('input_data',), PY2),
+    'greedy_003': Solver('greedy_003', 'solver', 'solve_it', ('input_data',), ANY_PYTHON),
+    'cp_homebrew_001': Solver('cp_homebrew_001', 'solver', 'solve_it', ('input_data',), PY2),
+    'cp_homebrew_002': Solver('cp_homebrew_002', 'solver', 'solve_it', ('input_data',), PY2),
+    'cp_homebrew_003': Solver('cp_homebrew_003', 'solver', 'solve_it', ('input_data', 'timeout'), PY2),
+    'cp_ortools_001': Solver('cp_ortools_001', 'solver', 'solve_it', ('input_data', 'sink'), ANY_PYTHON),
+    'cp_gecode_001': Solver('cp_gecode_001', 'solver', 'solve_it', ('input_data',), PY2),
+    'minizinc_001': Solver('minizinc_001', 'solver', 'solve_it', ('input_data',), PY2),
+    'lns_mip_002': Solver('lns_mip_002', 'lns', 'solve_file', ('path', 'time_limit', 'sink', 'store'), ANY_PYTHON),
+    'mm_SA_001': Solver('mm_SA_001', 'solver', 'solve_it', ('input_data', 'time_limit', 'sink', 'store'), ANY_PYTHON),
+    'tabu_001': Solver('tabu_001', 'solver', 'solve_it', ('input_data', 'time_limit', 'sink', 'store'), ANY_PYTHON),
+}
+# The solvers, that run under this interpreter
+SOLVERS = {name: solver for name, solver in REGISTRY.items() if sys.version_info[0] in solver.pythons}
+# The ones that scale to the large instances
+DEFAULT_SOLVERS = ['tabu_001', 'mm_SA_001', 'cp_ortools_001', 'lns_mip_002']
+# How often the driver checks the clock while it waits for messages, in s
+POLL_INTERVAL = 0.1
+# Time the solvers get less than the race, to return their answer before they are terminated, in s
+MARGIN = 1.0
+
+Result = namedtuple('Result', ['obj', 'is_optimal', 'solution', 'solver', 'errors'])
+
+
+def parse_output(output_data):
+    """
+    :param str output_data: the output format, the cost and the flag, then the assignment
+    :return (float, bool, list[int]):
+    """
+    lines = output_data.strip().split('\n')
+    parts = lines[0].split()
+    return float(parts[0]), bool(int(parts[1])), [int(x) for x in lines[1].split()]
+
+
+def run_solver(name, path, time_limit, sink=None, quiet=True, store=None):
+    """
+    Run a solver in this process. It changes the working directory and sys.path, so a process
+    should run only one solver.
+    :param str name: a key of SOLVERS
+    :param str path: the instance file
+    :param float time_limit: in s, for the solvers, that take it
+    :param sink: callable(obj, solution), for the solvers, that take it
+    :param bool quiet: hide the output of the solver
+    :param common.solutions.SolutionStore store: for the solvers, that take it
+    :return (float, bool, list[int]): the cost, whether it is proven optimal and the solution,
+        (None, False, None) if the solver has found nothing
+    """
+    solver = SOLVERS[name]
+    directory = os.path.join(ROOT, solver.directory)
+    os.chdir(directory)
+    sys.path.insert(0, directory)
+    if quiet:
+        sys.stdout = open(os.devnull, 'w')
+    function = getattr(importlib.import_module(solver.module), solver.function)
+
+    with open(path) as f:
+        input_data = f.read()
+    arguments = {
+        'input_data': input_data,
+        'path': path,
+        'time_limit': time_limit,
+        'timeout': int(time_limit),
+        'sink': sink if sink is not None else lambda obj, solution: None,
+        'store': store,
+    }
+    result = function(**{a: arguments[a] for a in solver.arguments})
+    if result is None:
+        return None, False, None
+    if isinstance(result, tuple):
+        return result[0], len(result) > 2 and bool(result[2]), list(result[1])
+    return parse_output(result)
+
+
+def _work(name, path, time_limit, queue, quiet, store):
+    """Runs one solver in the worker process, posts ('solution'|'done'|'error', name, ...) to the queue"""
+    try:
+        sink = lambda obj, solution: queue.put(('solution', name, obj, list(solution)))
+        queue.put(('done', name) + run_solver(name, path, time_limit, sink, quiet, store))
+    except Exception:
+        queue.put(('error', name, traceback.format_exc()))
+
+
+def race(path, solvers=DEFAULT_SOLVERS, time_limit=60, sink=None, quiet=True, store=None):
+    """
+    Run the solvers in parallel until one proves the optimum, all have finished or the time is over.
+    :param str path: the instance file
+    :param list[str] solvers: keys of SOLVERS
+    :param float time_limit: in s
+    :param sink: callable(obj, solution), gets every improvement of the best cover of the race
+    :param bool quiet: hide the output of the solvers
+    :param common.solutions.SolutionStore store: the solvers start from its best known solution,
+        the best cover of the race is recorded in it
+    :return Result: the best cover, the solver, that found it, and {solver: traceback} of the failed ones
+    :raise ValueError: if a solver is unknown or does not run under this interpreter
+    """
+    for name in solvers:
+        if name not in SOLVERS:
+            raise ValueError('{} is not a solver for Python {}, one of: {}'.format(
+                name, sys.version_info[0], ', '.join(sorted(SOLVERS))))
+    deadline = time.time() + time_limit
+    path = os.path.realpath(path)
+    queue = multiprocessing.Queue()
+    processes = {}
+    for name in solvers:
+        process = multiprocessing.Process(target=_work, args=(
+            name, path, max(time_limit - MARGIN, 1), queue, quiet, store))
+        process.daemon = True
+        process.start()
+        processes[name] = process
+
+    best = Result(None, False, None, None, {})
+    running = set(solvers)
+    try:
+        while running and not best.is_optimal and time.time() < deadline:
+            try:
+                message = queue.get(timeout=min(POLL_INTERVAL, max(deadline - time.time(), 0)))
+            except Empty:
+                # A solver killed from the outside never posts its 'done'
+                running = {name for name in running if not processes[name].exitcode}
+                continue
+            kind, name = message[:2]
+            if kind == 'error':
+                best.errors[name] = message[2]
+                running.discard(name)
+                continue
+            if kind == 'solution':
+                obj, is_optimal, solution = message[2], False, message[3]
+            else:
+                obj, is_optimal, solution = message[2:]
+                running.discard(name)
+            if obj is not None and (best.obj is None or obj < best.obj or (obj == best.obj and is_optimal)):
+                improved = best.obj is None or obj < best.obj
+                best = Result(obj, is_optimal, solution, name, best.errors)
+                if improved and sink is not None:
+                    sink(obj, solution)
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in processes.values():
+            process.join()
+    if store is not None and best.solution is not None:
+        try:
+            store.record(file_key(path), load_instance(path), best.obj, best.solution, best.is_optimal)
+        except ValueError:
+            best.errors[best.solver] = traceback.format_exc()
+    return best
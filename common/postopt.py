@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Post-optimization of a feasible cover.
+
+Greedy solvers stop as soon as everything is covered, so early picks often
+become redundant: every item of such a set is covered by the later picks too.
+"""
+import numpy as np
+
+
+def remove_redundant_sets(instance, solution):
+    """
+    Drop redundant sets, the most expensive ones first.
+
+    Keeps a counter of chosen sets per item, so a set is redundant if all its
+    items are counted at least twice. Dropping it decrements its counters.
+    The sweep touches every item of every chosen set a constant number of times.
+    An item listed twice in a set (e.g. in sc_8661_1) is counted once for it.
+    :param common.instance.Instance instance:
+    :param list[1|0] solution: a feasible cover
+    :return list[1|0]: a feasible cover without redundant sets, cost is not greater
+    """
+    solution = np.asarray(solution, dtype=bool)
+    chosen = np.flatnonzero(solution)
+
+    # Distinct (set, item) pairs of the chosen sets, so a repeated item counts once
+    sizes = np.diff(instance.offsets)
+    in_chosen = np.repeat(solution, sizes)
+    owners = np.repeat(np.arange(instance.set_count, dtype=np.int64), sizes)[in_chosen]
+    pairs = np.unique(owners * instance.item_count + instance.items[in_chosen])
+    cover_count = np.bincount(pairs % instance.item_count, minlength=instance.item_count)
+
+    result = solution.astype(int)
+    for set_idx in chosen[np.argsort(-instance.costs[chosen], kind='mergesort')]:
+        items = np.unique(instance.items[instance.offsets[set_idx]:instance.offsets[set_idx + 1]])
+        if cover_count[items].min(initial=2) >= 2:
+            cover_count[items] -= 1
+            result[set_idx] = 0
+    return result.tolist()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Presolve: reduce an instance before it is handed to a solver.
+
+The rules never lose an optimal solution, so the optimum of the reduced
+instance plus the cost of the fixed sets is the optimum of the original one:
+
+* duplicate sets -- only the cheapest copy of the same items is kept
+* forced sets -- an item with a single candidate set fixes that set, its
+  items are covered and disappear
+* column dominance -- a set whose items are all covered by one set, that is
+  not more expensive, is removed
+* row dominance -- if every set covering item ``i`` covers item ``k`` too,
+  ``k`` will be covered anyway and is removed
+
+Removing a set can force another one or make an item dominating, removing an
+item can make a set dominated, so the rules are repeated until nothing changes.
+
+On dense instances (e.g. sc_10000_*) nothing is dominated, and the checks are
+most of the time of presolve. So a rule is skipped after PROBE_SIZE checks of
+it, if no dominance check has removed anything so far; forced sets are still
+detected.
+
+``postsolve()`` maps a solution of the reduced instance back to the original sets.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from common.instance import COST_DTYPE, ITEM_DTYPE, OFFSET_DTYPE, Instance, transpose
+
+# How the reduced instance is related to the original one:
+#   set_count  -- count of sets in the original instance
+#   set_map    -- original index of every set of the reduced instance
+#   item_map   -- original index of every item of the reduced instance
+#   fixed_sets -- original indexes of the sets, that belong to every solution
+#   fixed_cost -- their total cost
+Reduction = namedtuple('Reduction', ['set_count', 'set_map', 'item_map', 'fixed_sets', 'fixed_cost'])
+
+# Count of checks of a dominance rule, that some dominance check must succeed in, for the others to be done
+PROBE_SIZE = 1000
+
+
+def presolve(instance):
+    """
+    :param common.instance.Instance instance:
+    :return (common.instance.Instance, Reduction): the reduced instance, items and sets are renumbered
+    :raise ValueError: if some item can't be covered
+    """
+    costs = instance.costs.tolist()
+    offsets = instance.offsets.tolist()
+    items = instance.items.tolist()
+    item_offsets, item_sets = (a.tolist() for a in transpose(instance))
+
+    set2items = {}
+    cheapest_copy = {}  # {items of a set: index of the cheapest set with them}
+    for set_idx in range(instance.set_count):
+        set_items = frozenset(items[offsets[set_idx]:offsets[set_idx + 1]])
+        if not set_items:
+            continue
+        copy_idx = cheapest_copy.setdefault(set_items, set_idx)
+        if costs[set_idx] < costs[copy_idx]:
+            del set2items[copy_idx]
+            cheapest_copy[set_items] = copy_idx = set_idx
+        if copy_idx == set_idx:
+            set2items[set_idx] = set(set_items)
+
+    live_sets = set(set2items)  # a set, so the intersection walks the smaller side, not the whole dict
+    item2sets = {}
+    for item_idx in range(instance.item_count):
+        sets = live_sets.intersection(item_sets[item_offsets[item_idx]:item_offsets[item_idx + 1]])
+        if not sets:
+            raise ValueError('item {} is not covered by any set'.format(item_idx))
+        item2sets[item_idx] = sets
+
+    fixed_sets = _reduce(costs, set2items, item2sets)
+
+    set_map = np.array(sorted(set2items), dtype=ITEM_DTYPE)
+    item_map = np.array(sorted(item2sets), dtype=ITEM_DTYPE)
+    new_item_index = np.full(instance.item_count, -1, dtype=ITEM_DTYPE)
+    new_item_index[item_map] = np.arange(len(item_map), dtype=ITEM_DTYPE)
+
+    reduced_offsets = np.zeros(len(set_map) + 1, dtype=OFFSET_DTYPE)
+    np.cumsum([len(set2items[s]) for s in set_map.tolist()], out=reduced_offsets[1:])
+    reduced_items = np.array([i for s in set_map.tolist() for i in sorted(set2items[s])], dtype=ITEM_DTYPE)
+    reduced = Instance(len(item_map), len(set_map),
+                       np.asarray(instance.costs, dtype=COST_DTYPE)[set_map],
+                       reduced_offsets,
+                       new_item_index[reduced_items])
+
+    fixed_sets = sorted(fixed_sets)
+    reduction = Reduction(instance.set_count, set_map, item_map, fixed_sets, sum(costs[s] for s in fixed_sets))
+    return reduced, reduction
+
+
+def postsolve(reduction, solution):
+    """
+    :param Reduction reduction:
+    :param list[1|0] solution: a solution of the reduced instance
+    :return list[1|0]: the solution of the original instance
+    """
+    result = np.zeros(reduction.set_count, dtype=int)
+    result[reduction.set_map] = solution
+    result[reduction.fixed_sets] = 1
+    return result.tolist()
+
+
+def _reduce(costs, set2items, item2sets):
+    """
+    Apply the rules to the dicts in place until nothing changes.
+    :return set[int]: the fixed sets
+    """
+    fixed_sets = set()
+    items_to_check = set(item2sets)
+    sets_to_check = set(set2items)
+    set_checks = item_checks = 0  # count of the column and the row dominance checks
+    found = False                 # whether some dominance check has removed something
+
+    def cover(items):
+        # Remove covered (or dominated) items, returns the sets that have lost some of them
+        touched_sets = set()
+        for item_idx in items:
+            touched_sets.update(item2sets.pop(item_idx))
+        shrunk_sets = set()
+        for set_idx in touched_sets:
+            set_items = set2items.get(set_idx)
+            if set_items is None:
+                continue
+            set_items -= items
+            if set_items:
+                shrunk_sets.add(set_idx)
+            else:
+                del set2items[set_idx]
+        return shrunk_sets
+
+    # Sets go first: removing a set re-checks its items, and an item check is the more expensive one
+    while True:
+        column_dominance = found or set_checks < PROBE_SIZE
+        row_dominance = found or item_checks < PROBE_SIZE
+        if sets_to_check and column_dominance:
+            set_idx = sets_to_check.pop()
+            set_items = set2items.get(set_idx)
+            if set_items is None:
+                continue
+            set_checks += 1
+            # The dominating set is a candidate of every item of the set
+            cost = costs[set_idx]
+            size = len(set_items)
+            for other in _intersection(item2sets, set_items):
+                if other != set_idx and costs[other] <= cost and \
+                        (costs[other] < cost or len(set2items[other]) > size or other < set_idx):
+                    found = True
+                    del set2items[set_idx]
+                    for item_idx in set_items:
+                        item2sets[item_idx].discard(set_idx)
+                        items_to_check.add(item_idx)  # it may become forced or dominating
+                    break
+        elif items_to_check:
+            item_idx = items_to_check.pop()
+            sets = item2sets.get(item_idx)
+            if sets is None:
+                continue
+            if len(sets) == 1:
+                set_idx, = sets
+                fixed_sets.add(set_idx)
+                sets_to_check.update(cover(set2items.pop(set_idx)))
+                continue
+            if not row_dominance:
+                continue
+            item_checks += 1
+            # A dominated item is in every candidate set of the dominating one
+            dominated = _intersection(set2items, sets)
+            dominated.discard(item_idx)
+            if dominated:
+                found = True
+                sets_to_check.update(cover(dominated))
+        else:
+            break  # nothing to check, or only the sets, while the probe has found nothing
+    return fixed_sets
+
+
+def _intersection(index, keys):
+    """
+    Intersect index[key] for all the keys, starting from the smallest one, so it shrinks fast.
+    & walks the smaller of two sets, so the order of the other keys matters little, and they are
+    not sorted. The smallest entry is not copied either, the first & makes a new set.
+    :return set: a new set
+    """
+    keys = list(keys)
+    smallest = min(zip(map(len, map(index.__getitem__, keys)), keys))[1]
+    result = index[smallest]
+    for key in keys:
+        if key != smallest:
+            result = result & index[key]
+            if len(result) <= 1:
+                break  # only the key itself is left
+    return set(result) if result is index[smallest] else result
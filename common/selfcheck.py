@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Regression checks of the shared code on the small instances of the data directory.
+
+For every instance:
+
+* lazy_greedy() gives a cover, remove_redundant_sets() keeps it a cover without
+  redundant sets and does not make it more expensive
+* validate.check() agrees with a plain recount of the cover
+* the postsolved greedy cover of the presolved instance is a cover of the
+  original one, and its cost is the reduced cost plus the fixed cost
+* presolve keeps the optimum, on the instances with at most BRUTE_FORCE_SETS
+  sets (both optima are found by enumeration)
+* a solution store keeps the cover, gives it back and refuses a spoiled one
+
+Usage: python common/selfcheck.py [--max-size 1000] [--pattern 'sc_*']
+It prints a line per instance and exits with 1, if some check has failed.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.benchmark import DATA_ROOT, list_instances
+from common.cache import load_instance
+from common.greedy import lazy_greedy
+from common.instance import to_sets
+from common.postopt import remove_redundant_sets
+from common.presolve import postsolve, presolve
+from common.solutions import COST_TOLERANCE, SolutionStore, file_key
+from common.validate import check, check_batch
+
+# The greatest set count of an instance, that is solved by enumeration of all the assignments
+BRUTE_FORCE_SETS = 16
+
+
+def same_cost(a, b):
+    return abs(a - b) <= COST_TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+def recount(instance, solution):
+    """
+    The feasibility and the cost of a cover with plain Python, to compare with common/validate.py
+    :return (bool, float):
+    """
+    covered = set()
+    obj = 0.0
+    for s in to_sets(instance):
+        if solution[s.index]:
+            covered.update(s.items)
+            obj += s.cost
+    return len(covered) == instance.item_count, obj
+
+
+def greedy_cover(instance):
+    """:return list[1|0]: the lazy_greedy() cover of the instance"""
+    solution = [0] * instance.set_count
+    for s in lazy_greedy(instance):
+        solution[s] = 1
+    return solution
+
+
+def optimum(instance):
+    """:return float: the least cost of a cover, by enumeration of all the assignments"""
+    if instance.item_count == 0:
+        return 0.0
+    assignments = (np.arange(2 ** instance.set_count)[:, None] >> np.arange(instance.set_count)) & 1
+    return min(result.cost for result in check_batch(instance, assignments) if result.feasible)
+
+
+def check_instance(path):
+    """
+    :param str path: the instance file
+    :return list[str]: descriptions of the failed checks, empty if all have passed
+    """
+    failures = []
+    instance = load_instance(path)
+
+    cover = greedy_cover(instance)
+    result = check(instance, cover)
+    if not result.feasible:
+        failures.append('lazy_greedy: {} items are uncovered'.format(len(result.uncovered)))
+    feasible, obj = recount(instance, cover)
+    if result.feasible != feasible or not same_cost(result.cost, obj):
+        failures.append('validate: check() {} disagrees with the recount {}'.format(
+            (result.feasible, result.cost), (feasible, obj)))
+
+    trimmed = remove_redundant_sets(instance, cover)
+    trimmed_result = check(instance, trimmed)
+    if not trimmed_result.feasible:
+        failures.append('remove_redundant_sets: {} items are uncovered'.format(len(trimmed_result.uncovered)))
+    if trimmed_result.cost > result.cost:
+        failures.append('remove_redundant_sets: the cost {} > {}'.format(trimmed_result.cost, result.cost))
+    if len(trimmed_result.redundant):
+        failures.append('remove_redundant_sets: sets {} are still redundant'.format(trimmed_result.redundant.tolist()))
+
+    reduced, reduction = presolve(instance)
+    reduced_cover = greedy_cover(reduced)
+    reduced_cost = check(reduced, reduced_cover).cost
+    restored = check(instance, postsolve(reduction, reduced_cover))
+    if not restored.feasible:
+        failures.append('postsolve: {} items are uncovered'.format(len(restored.uncovered)))
+    if not same_cost(restored.cost, reduced_cost + reduction.fixed_cost):
+        failures.append('postsolve: the cost {} is not {} + the fixed {}'.format(
+            restored.cost, reduced_cost, reduction.fixed_cost))
+    if instance.set_count <= BRUTE_FORCE_SETS:
+        original_optimum, reduced_optimum = optimum(instance), optimum(reduced)
+        if not same_cost(original_optimum, reduced_optimum + reduction.fixed_cost):
+            failures.append('presolve: the optimum {} is not {} + the fixed {}'.format(
+                original_optimum, reduced_optimum, reduction.fixed_cost))
+
+    failures.extend(check_store(path, instance, trimmed, trimmed_result.cost))
+    return failures
+
+
+def check_store(path, instance, solution, obj):
+    """:return list[str]: descriptions of the failed checks of common.solutions.SolutionStore"""
+    failures = []
+    directory = tempfile.mkdtemp()
+    try:
+        store = SolutionStore(directory)
+        key = file_key(path)
+        if not store.record(key, instance, obj, solution):
+            failures.append('store: the first cover is not kept')
+        if store.get(key) != (obj, False, solution):
+            failures.append('store: got {} back'.format(store.get(key)))
+        if store.record(key, instance, obj, solution):
+            failures.append('store: a cover as good as the stored one is kept')
+        spoiled = [
+            ('a wrong objective', obj - 1, solution),
+            ('an infeasible cover', 0.0, [0] * instance.set_count),
+        ]
+        for name, spoiled_obj, spoiled_solution in spoiled:
+            if instance.item_count == 0 and spoiled_solution != solution:
+                continue  # nothing to uncover
+            try:
+                store.record(key, instance, spoiled_obj, spoiled_solution)
+                failures.append('store: {} is not refused'.format(name))
+            except ValueError:
+                pass
+    finally:
+        shutil.rmtree(directory)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the shared code on the instances of the data directory')
+    parser.add_argument('--max-size', type=int, default=1000, help='the greatest item count of an instance')
+    parser.add_argument('--pattern', default='*', help='shell pattern of the instance names, e.g. sc_1000_*')
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for name in list_instances(max_size=args.max_size, pattern=args.pattern):
+        failures = check_instance(os.path.join(DATA_ROOT, name))
+        print('{:<12} {}'.format(name, 'ok' if not failures else 'FAILED'))
+        for failure in failures:
+            print('    ' + failure)
+        failed += bool(failures)
+    print('{} instances failed'.format(failed))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Sinks for the solutions found during a long run.
+
+A sink is any callable ``sink(obj, solution)``, that is called with every
+improving solution (``solution`` is a list of 1|0 over the sets). So the best
+cover so far is available even if the run is killed before it finishes.
+"""
+import os
+
+from common.presolve import postsolve
+
+
+def format_solution(obj, solution, is_optimal=0):
+    """The output format of the assignment: the cost and the flag, then the assignment"""
+    return '{} {}\n{}'.format(obj, int(is_optimal), ' '.join(map(str, solution)))
+
+
+class FileSink(object):
+    """Keeps the latest solution in a file in the output format"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, obj, solution):
+        # Write to a temporary file and rename it, so a reader never sees a half-written solution
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            f.write(format_solution(obj, solution))
+            f.write('\n')
+        if os.name == 'nt' and os.path.exists(self.path):
+            os.remove(self.path)  # Windows does not replace an existing file
+        os.rename(tmp_path, self.path)
+
+
+class QueueSink(object):
+    """Puts (obj, solution) into a queue, e.g. a multiprocessing.Queue read by another process"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __call__(self, obj, solution):
+        self.queue.put((obj, list(solution)))
+
+
+class PostsolveSink(object):
+    """Maps solutions of a presolved instance to the original sets before passing them on"""
+
+    def __init__(self, sink, reduction):
+        """
+        :param sink: the sink for the solutions of the original instance
+        :param common.presolve.Reduction reduction:
+        """
+        self.sink = sink
+        self.reduction = reduction
+
+    def __call__(self, obj, solution):
+        self.sink(obj + self.reduction.fixed_cost, postsolve(self.reduction, solution))
+
+
+class TeeSink(object):
+    """Passes the solutions to several sinks"""
+
+    def __init__(self, *sinks):
+        """
+        :param sinks: the sinks, None ones are skipped
+        """
+        self.sinks = [sink for sink in sinks if sink is not None]
+
+    def __call__(self, obj, solution):
+        for sink in self.sinks:
+            sink(obj, solution)
+
+
+class StoreSink(object):
+    """Records the solutions in a common.solutions.SolutionStore, the store keeps the best one"""
+
+    def __init__(self, store, key, instance):
+        """
+        :param common.solutions.SolutionStore store:
+        :param str key: the key of the instance, see common.solutions.instance_key()
+        :param common.instance.Instance instance: the original instance
+        """
+        self.store = store
+        self.key = key
+        self.instance = instance
+        # Recording takes the lock and reads the stored file, so skip the solutions, that can't be kept
+        self.best_obj = store.best_objective(key)
+
+    def __call__(self, obj, solution):
+        if self.best_obj is not None and obj >= self.best_obj:
+            return
+        self.store.record(self.key, self.instance, obj, solution)
+        self.best_obj = obj
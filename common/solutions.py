@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Store of the best known solution of every instance.
+
+The store is a directory with a file ``<key>.sol`` per instance in the output
+format (the cost and the optimality flag, then the assignment). The key is the
+SHA-1 of the instance text, so renamed or copied instance files share their
+entry and a changed file gets a new one.
+
+record() checks a solution against the instance (common/validate.py): an
+infeasible cover or a wrong objective is refused, so a bug of a solver can't
+spoil the gaps and the warm starts of the others. It keeps a solution only if
+it is better than the stored one. It reads, compares and replaces the file
+under an exclusive lock of ``<key>.lock``, and the new file is renamed into
+place, so parallel solvers (the portfolio, the benchmark) can record into the
+same store and a reader never sees a half-written file.
+"""
+import binascii
+import os
+
+from common.cache import source_digest
+from common.sinks import format_solution
+from common.validate import check
+
+try:
+    import fcntl
+except ImportError:  # Windows: no locking, the rename still keeps the files whole
+    fcntl = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+DEFAULT_DIR = os.path.join(ROOT, 'data', '.solutions')
+SOLUTION_EXT = '.sol'
+# Relative difference of the objective and the cost of a recorded cover, that is a rounding error
+COST_TOLERANCE = 1e-9
+
+
+def instance_key(input_data):
+    """
+    :param str|bytes input_data: content of the instance file
+    :return str: the hex SHA-1 of the content
+    """
+    if not isinstance(input_data, bytes):
+        input_data = input_data.encode('ascii')
+    return binascii.hexlify(source_digest(input_data)).decode('ascii')
+
+
+def file_key(path):
+    """:return str: the key of the instance file"""
+    with open(path, 'rb') as f:
+        return instance_key(f.read())
+
+
+def gap(obj, best):
+    """Relative gap of the objective to the best known one, None if there is no best known one"""
+    if obj is None or best is None:
+        return None
+    if best == 0:
+        return 0.0 if obj == 0 else float('inf')
+    return (obj - best) / float(best)
+
+
+class SolutionStore(object):
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SOLUTION_EXT)
+
+    def get(self, key):
+        """
+        :param str key: see instance_key()
+        :return (float, bool, list[int])|None: the cost, whether it is proven optimal and the
+            assignment of the best known solution, None if there is none
+        """
+        try:
+            with open(self.path(key)) as f:
+                lines = f.read().split('\n')
+        except (IOError, OSError):
+            return None
+        parts = lines[0].split()
+        return float(parts[0]), bool(int(parts[1])), [int(x) for x in lines[1].split()]
+
+    def best_objective(self, key):
+        best = self.get(key)
+        return best[0] if best is not None else None
+
+    def gap(self, key, obj):
+        """Relative gap of the objective to the best known one, None if there is no best known one"""
+        return gap(obj, self.best_objective(key))
+
+    def record(self, key, instance, obj, solution, is_optimal=False):
+        """
+        Keep the solution if it is better than the stored one, or as good and proven optimal.
+        :param str key: see instance_key()
+        :param common.instance.Instance instance: the original instance, to check the solution
+        :param float obj: cost of the solution
+        :param list[1|0] solution: assignment of the original instance
+        :param bool is_optimal:
+        :return bool: whether the solution was kept
+        :raise ValueError: if the solution is not a cover of the instance or its cost is not obj
+        """
+        result = check(instance, solution)
+        if not result.feasible:
+            raise ValueError('not a cover, {} items are uncovered'.format(len(result.uncovered)))
+        if abs(result.cost - obj) > COST_TOLERANCE * max(1.0, abs(obj)):
+            raise ValueError('the objective {} is not the cost of the cover {}'.format(obj, result.cost))
+
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                if not os.path.isdir(self.directory):  # somebody else could create it meanwhile
+                    raise
+
+        with open(os.path.join(self.directory, key + '.lock'), 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # released when the file is closed
+            best = self.get(key)
+            if best is not None and (best[0] < obj or (best[0] == obj and (best[1] or not is_optimal))):
+                return False
+
+            path = self.path(key)
+            tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+            with open(tmp_path, 'w') as f:
+                f.write(format_solution(obj, solution, is_optimal))
+                f.write('\n')
+            if os.name == 'nt' and os.path.exists(path):
+                os.remove(path)  # Windows does not replace an existing file
+            os.rename(tmp_path, path)
+            return True
+
+    def warm_start(self, key, reduction=None):
+        """
+        The sets of the best known solution, to start a search from.
+        :param str key: see instance_key()
+        :param common.presolve.Reduction reduction: map the sets to the presolved instance. Sets
+            removed by the presolve are dropped, so the result may not be a cover of it any more
+            (common.greedy.lazy_greedy(instance, initial=...) completes it)
+        :return list[int]: indexes of the sets, empty if there is no best known solution
+        """
+        best = self.get(key)
+        if best is None:
+            return []
+        solution = best[2]
+        if reduction is None:
+            return [s for s, x in enumerate(solution) if x]
+        return [s for s, original in enumerate(reduction.set_map.tolist()) if solution[original]]
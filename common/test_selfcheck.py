@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+The checks of common/selfcheck.py as a test: python -m pytest common
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.benchmark import DATA_ROOT, list_instances
+from common.cache import load_instance
+from common.greedy import lazy_greedy
+from common.instance import parse_input
+from common.selfcheck import BRUTE_FORCE_SETS, check_instance, optimum
+
+# The greatest item count of the checked instances, as the default of selfcheck.py
+MAX_SIZE = 1000
+
+# The greedy takes the cheapest set per item, 0 1 2 3, and then needs both others
+GREEDY_TRAP = """6 3
+3 0 1 2 3
+3 0 1 4
+3 2 3 5
+"""
+
+
+class SelfCheckTest(unittest.TestCase):
+
+    def test_small_instances(self):
+        names = list_instances(max_size=MAX_SIZE)
+        self.assertTrue(names, 'no instances in ' + DATA_ROOT)
+        for name in names:
+            with self.subTest(instance=name):
+                self.assertEqual(check_instance(os.path.join(DATA_ROOT, name)), [])
+
+    def test_brute_force_is_checked(self):
+        # Otherwise the optimum kept by presolve is not checked on any instance
+        set_counts = [load_instance(os.path.join(DATA_ROOT, name)).set_count
+                      for name in list_instances(max_size=MAX_SIZE)]
+        self.assertTrue(any(set_count <= BRUTE_FORCE_SETS for set_count in set_counts))
+
+    def test_optimum(self):
+        instance = parse_input(GREEDY_TRAP)
+        self.assertEqual(sorted(lazy_greedy(instance)), [0, 1, 2])
+        self.assertEqual(optimum(instance), 6.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
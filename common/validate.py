@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Feasibility and cost of covers, on the CSR arrays.
+
+The cover count of every item is one ``np.bincount`` over the items of the
+chosen sets and the cost is a dot product, so no Python object is created
+per set or per item. A batch of covers is checked with the same calls on
+a matrix, a row per cover.
+
+A chosen set is redundant if every item of it is covered at least twice:
+it can be dropped alone (dropping two redundant sets may uncover an item,
+see common/postopt.py for a cover without them).
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from common.instance import set_sizes
+
+# feasible  -- whether every item is covered
+# cost      -- total cost of the chosen sets
+# uncovered -- indexes of the items, that no chosen set covers
+# redundant -- indexes of the chosen sets, that can be dropped alone
+Check = namedtuple('Check', ['feasible', 'cost', 'uncovered', 'redundant'])
+
+
+def check(instance, solution):
+    """
+    :param common.instance.Instance instance:
+    :param list[1|0] solution: an assignment of the sets
+    :return Check:
+    """
+    return check_batch(instance, [solution])[0]
+
+
+def check_batch(instance, solutions):
+    """
+    Check many covers of the same instance at once.
+    :param common.instance.Instance instance:
+    :param list[list[1|0]]|np.ndarray solutions: assignments of the sets, a row per cover
+    :return list[Check]: in the order of the solutions
+    :raise ValueError: if an assignment has not a value per set
+    """
+    chosen = np.asarray(solutions, dtype=bool).reshape(len(solutions), -1)
+    if chosen.shape[1] != instance.set_count:
+        raise ValueError('expected {} values per assignment, got {}'.format(instance.set_count, chosen.shape[1]))
+    count, item_count = len(chosen), instance.item_count
+    sizes = set_sizes(instance)
+    items = np.asarray(instance.items, dtype=np.int64)
+
+    # Cover counts of all the covers in one flat bincount: item i of cover k is k * item_count + i
+    chosen_items = np.repeat(chosen, sizes, axis=1)
+    keys = (np.arange(count, dtype=np.int64)[:, None] * item_count + items[None, :])[chosen_items]
+    cover_counts = np.bincount(keys, minlength=count * item_count).reshape(count, item_count)
+    costs = chosen.dot(np.asarray(instance.costs, dtype=np.float64))
+
+    # The least cover count of the items of every set, empty sets are always redundant
+    non_empty = np.flatnonzero(sizes > 0)
+    least_count = np.full((count, instance.set_count), 2, dtype=cover_counts.dtype)
+    if len(non_empty):
+        least_count[:, non_empty] = np.minimum.reduceat(cover_counts[:, items], instance.offsets[non_empty], axis=1)
+    redundant = chosen & (least_count >= 2)
+
+    uncovered = cover_counts == 0
+    return [Check(not uncovered[k].any(), float(costs[k]), np.flatnonzero(uncovered[k]), np.flatnonzero(redundant[k]))
+            for k in range(count)]
+
+
+def is_feasible(instance, solution):
+    return check(instance, solution).feasible
+
+
+def cost(instance, solution):
+    return float(np.asarray(solution, dtype=bool).dot(np.asarray(instance.costs, dtype=np.float64)))
@@ -87,53 +87,56 @@
 # -------------------------------------------------------------------------------------------------- 
 
 import os
+import sys
 from subprocess import Popen, PIPE
-from collections import namedtuple
-
-Set = namedtuple("Set", ['index', 'cost', 'items'])
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.instance import parse_input, to_sets
+from common.presolve import postsolve, presolve
 
 def solve_it(input_data):
-    # parse the input
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
-    
-    sets = []
-    for i in range(1, set_count+1):
-        parts = lines[i].split()
-        sets.append(Set(i-1, float(parts[0]), map(int, parts[1:])))
-
-    # generate data file -> this is necessary since we cannot pass over the instance file name
-    data_file = "data.txt"
-    generateDataFile(item_count, set_count, sets, data_file)
-
-    # specify the number of solutions you want to compute. '0' returns all solutions.
-    nb_solutions = 20 
-
-    # solve using the Gecode executable 'set_cover'
-    process = Popen(['./set_cover', 'data.txt', str(nb_solutions)], 
-                    stdout=PIPE, stderr=PIPE)
-    # ALTERNATIVELY: run Gecode with the search visualization tool 'gist' to browse 
-    #                the search tree. This will open a window where clicking on 
-    #                'Search'->'all solutions' will display the whole search tree.
-    #                You will need to have compiled Gecode with gist on, however. 
-    #process = Popen(['./set_cover', '-mode gist','data.txt', str(nb_solutions)], 
-    #                stdout=PIPE, stderr=PIPE)
-
-    (stdout, stderr) = process.communicate()
-
-    # comment the following line if you do not want to see Gecode's output
-    print stdout
-    # print error messages if there are any 
-    print stderr     
-
-    # extract the solution from standard-out
-    obj,solution = extractSolution(stdout,set_count)
+    # parse the input and reduce it (see common/presolve.py), Gecode gets the reduced instance
+    instance, reduction = presolve(parse_input(input_data))
+    item_count = instance.item_count
+    set_count = instance.set_count
+    sets = to_sets(instance)
+
+    if item_count > 0:
+        # generate data file -> this is necessary since we cannot pass over the instance file name
+        data_file = "data.txt"
+        generateDataFile(item_count, set_count, sets, data_file)
+
+        # specify the number of solutions you want to compute. '0' returns all solutions.
+        nb_solutions = 20 
+
+        # solve using the Gecode executable 'set_cover'
+        process = Popen(['./set_cover', 'data.txt', str(nb_solutions)], 
+                        stdout=PIPE, stderr=PIPE)
+        # ALTERNATIVELY: run Gecode with the search visualization tool 'gist' to browse 
+        #                the search tree. This will open a window where clicking on 
+        #                'Search'->'all solutions' will display the whole search tree.
+        #                You will need to have compiled Gecode with gist on, however. 
+        #process = Popen(['./set_cover', '-mode gist','data.txt', str(nb_solutions)], 
+        #                stdout=PIPE, stderr=PIPE)
+
+        (stdout, stderr) = process.communicate()
+
+        # comment the following line if you do not want to see Gecode's output
+        print stdout
+        # print error messages if there are any 
+        print stderr     
+
+        # extract the solution from standard-out
+        obj,solution = extractSolution(stdout,set_count)
+        is_optimal = 0
+    else:  # presolve has fixed everything
+        obj, solution, is_optimal = 0, [], 1
+
+    # map the solution back to the original sets
+    obj = float(obj) + reduction.fixed_cost
+    solution = postsolve(reduction, solution)
 
     # prepare the solution in the specified output format
-    output_data = str(obj) + ' ' + str(0) + '\n'
+    output_data = str(obj) + ' ' + str(is_optimal) + '\n'
     output_data += ' '.join(map(str, solution))
 
     return output_data
@@ -36,24 +36,21 @@
 # a simple CP solver
 # 
 
+import os
+import sys
 from collections import namedtuple
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.instance import parse_input, to_sets
 Problem = namedtuple("Problem", ['items', 'sets'])
-Set = namedtuple("Set", ['index', 'cost', 'items'])
 Solution = namedtuple("Solution", ['assignment', 'obj'])
 
 def solve_it(input_data):
 
     # parse the input
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
-    
-    sets = []
-    for i in range(1, set_count+1):
-        parts = lines[i].split()
-        sets.append(Set(i-1, float(parts[0]), map(int, parts[1:])))
+    instance = parse_input(input_data)
+    item_count = instance.item_count
+    set_count = instance.set_count
+    sets = to_sets(instance)
 
     problem = Problem(range(0,item_count), sets)
     
@@ -36,30 +36,36 @@
 # 
 
 
-from collections import namedtuple 
-Problem = namedtuple("Problem", ['items', 'sets'])
-Set = namedtuple("Set", ['index', 'cost', 'items'])
+import os
+import sys
+from collections import namedtuple
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.bitset import full_mask, is_subset, items_to_mask, union
+from common.instance import parse_input, to_sets
+# masks, bits and full_mask are None, if the coverage is tracked with lists
+Problem = namedtuple("Problem", ['items', 'sets', 'masks', 'bits', 'full_mask'])
 Solution = namedtuple("Solution", ['assignment', 'obj'])
 
-def solve_it(input_data):
+# bitsets: track the coverage with bitsets (bit i of a mask stands for item i),
+#  instead of lists of 0/1 per item. The instances, that this search can finish,
+#  are too small for it to pay off (sc_15_0: 0.130 s either way), so it is off by default
+def solve_it(input_data, bitsets=False):
     
     # parse the input
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
-    
-    sets = []
-    for i in range(1, set_count+1):
-        parts = lines[i].split()
-        sets.append(Set(i-1, float(parts[0]), map(int, parts[1:])))
+    instance = parse_input(input_data)
+    item_count = instance.item_count
+    set_count = instance.set_count
+    sets = to_sets(instance)
     
     
     # Improvement: re-order sets from the order in the file 
     #  to improve the search procudure.
     #  Don't forget to un-order them in the output_data.
-    problem = Problem(range(0,item_count), sets)
+    if bitsets:
+        problem = Problem(range(0,item_count), sets, [items_to_mask(s.items) for s in sets],
+                          [1 << item for item in range(0,item_count)], full_mask(item_count))
+    else:
+        problem = Problem(range(0,item_count), sets, None, None, None)
     
     solver_data = {'best_solution':None, 'node_count':0, 'fail_count':0}
     
@@ -104,11 +110,14 @@ def tryall(assignment, domains, problem, data):
     # 1 - check if the remaining subtree has a feasible solution
     # 2 - detect if any sets *must* to be taken, in the remaining subtree
     # 3 - detect if any sets *need not* be taken, in the remaining subtree
-    covered_so_far = [0]*len(problem.items)
-    for s,v in enumerate(assignment):
-        if v == 1:
-            for item in problem.sets[s].items:
-                covered_so_far[item] = 1
+    if problem.masks is not None:
+        covered_so_far = union(problem.masks, assignment)
+    else:
+        covered_so_far = [0]*len(problem.items)
+        for s,v in enumerate(assignment):
+            if v == 1:
+                for item in problem.sets[s].items:
+                    covered_so_far[item] = 1
 
     remaining_sets = range(len(assignment), len(assignment)+len(domains))
     
@@ -123,7 +132,11 @@ def tryall(assignment, domains, problem, data):
             sets_that_cover[item].add(s)
     
     for item in problem.items:
-        if covered_so_far[item] == 0:
+        if problem.masks is not None:
+            is_covered = covered_so_far & problem.bits[item]
+        else:
+            is_covered = covered_so_far[item] == 1
+        if not is_covered:
             # if we have not covered an item and
             # no remaing sets can conver that item
             # then the remaining subtree contains no feasible solution
@@ -139,13 +152,15 @@ def tryall(assignment, domains, problem, data):
                     domains[s-len(assignment)] = [1]
     
     for s in remaining_sets:
-        covered_count = sum([covered_so_far[item] for item in problem.sets[s].items])
-        
         # assuming all costs are posative:
         # if every item in a set is already covered
         # taking that set can only increase the objective value
         # hence, we need not consider adding that set in the remaining subtree
-        if covered_count == len(problem.sets[s].items):
+        if problem.masks is not None:
+            all_covered = is_subset(problem.masks[s], covered_so_far)
+        else:
+            all_covered = all([covered_so_far[item] == 1 for item in problem.sets[s].items])
+        if all_covered:
             domains[s-len(assignment)] = [0]
     
     
@@ -198,21 +213,39 @@ def tryall(assignment, domains, problem, data):
 # if so, returns the objective value
 def check_it(assignment, problem):
     
-    # start with all items uncovered
-    covered = [0]*len(problem.items)
-    obj = 0
-    
-    # go over the items of selected sets
-    # markig covered items
-    for s,v in enumerate(assignment):
-        if v == 1:
-            obj += problem.sets[s].cost
-            for item in problem.sets[s].items:
-                covered[item] = 1
-            
-    # if every value in covered is 1,
-    # then the solution is feasible
-    if sum(covered) == len(covered):
+    if problem.masks is not None:
+        # start with all items uncovered
+        covered = 0
+        obj = 0
+        
+        # go over the selected sets
+        # markig covered items in the bitset
+        for s,v in enumerate(assignment):
+            if v == 1:
+                obj += problem.sets[s].cost
+                covered |= problem.masks[s]
+                
+        # if every bit in covered is 1,
+        # then the solution is feasible
+        feasible = covered == problem.full_mask
+    else:
+        # start with all items uncovered
+        covered = [0]*len(problem.items)
+        obj = 0
+        
+        # go over the selected sets
+        # markig covered items
+        for s,v in enumerate(assignment):
+            if v == 1:
+                obj += problem.sets[s].cost
+                for item in problem.sets[s].items:
+                    covered[item] = 1
+                    
+        # if every item is covered,
+        # then the solution is feasible
+        feasible = sum(covered) == len(covered)
+    
+    if feasible:
         return obj
     else:
         return None
@@ -2,20 +2,117 @@
 # encoding: utf-8
 from math import ceil
 
+from cp_matrix import Matrix
+
+# Incremental sum accumulates float errors, so we recalculate it from scratch from time to time
+RESYNC_PERIOD = 10000
+# Incremental update walks the changed sets in Python, full recalculation walks item2sets in C (map).
+# So we switch to the full one, when the changed sets are larger than 1/DENSE_RATIO of item2sets
+DENSE_RATIO = 4
+# The incremental bound pays off on tasks of many small sets (sc_1000_*, sc_2000_*, sc_4000_*). On smaller tasks,
+# or with larger sets (sc_330_0, sc_5000_*), a change touches most of the items, and the bound from scratch is cheaper
+# than the bookkeeping
+INCREMENTAL_MIN_SETS = 1000
+INCREMENTAL_MAX_SET_SIZE = 20  # mean count of items in a set
+# Relative tolerance for ceil(): a bit weaker bound is still correct, a bit stronger one is not
+TOLERANCE = 1e-9
+
+
+def ceil_with_tolerance(bound):
+    return ceil(bound - TOLERANCE * max(1.0, bound))
+
 
 class Estimator(object):
     def __init__(self, task):
         self.set_costs = {s.index: float(s.cost) for s in task.sets}
-        self.metrics = {'cut_exp': 0, 'not_cut_exp': 0, 'rollback_exp': 0}
+        self.metrics = {}
+        self.cheapest_split = {}  # {item_index: the cheapest part of a set, that can cover the item}
+        self.last_split = {s.index: self.set_costs[s.index] / len(set(s.items))  # {set_index: its part, when we have seen it}
+                           for s in task.sets if s.items}
+        self.additional = 0.0     # sum of cheapest_split
+        self.calls = 0
+        self.incremental = task.set_count >= INCREMENTAL_MIN_SETS and \
+            sum(len(s.items) for s in task.sets) <= INCREMENTAL_MAX_SET_SIZE * task.set_count
+        self.matrix = Matrix(task)
 
     def get_optimistic(self, state):
+        if not self.incremental:
+            return self.get_optimistic_from_scratch(state)
+
+        # split every set on the not covered items and choose the cheapest one for every item
+        # We keep the cheapest parts from the previous call and update only what the state has touched since:
+        #  - sets, that have changed their count of items, get the new part
+        #  - items, that have got or lost candidates, are recalculated from scratch
+        #  - other items of the changed sets are compared with the new part
+        set_costs = self.set_costs
+        set2items = state.set2items
+        item2sets = state.item2sets
+        cheapest_split = self.cheapest_split
+        last_split = self.last_split
+        additional = self.additional
+
+        changed_sets = []
+        changed_size = 0
+        for set_idx in state.dirty_sets:
+            items = set2items.get(set_idx)
+            if not items:
+                continue  # its items are covered or have lost it, so they are dirty
+            split = set_costs[set_idx] / len(items)
+            previous = last_split[set_idx]
+            if split != previous:
+                last_split[set_idx] = split
+                changed_sets.append((items, previous, split))
+                changed_size += len(items)
+
+        dirty_items = state.dirty_items
+        if changed_size * DENSE_RATIO > state.candidates_count:
+            # On dense tasks almost every set is touched, so recalculating all the items is cheaper
+            self.recalc_all(state)
+            return ceil_with_tolerance(state.current_cost + self.additional)
+
+        for item in dirty_items:
+            additional -= cheapest_split.pop(item, 0.0)
+            sets = item2sets.get(item)
+            if sets:  # item is not covered yet
+                split = min(map(last_split.__getitem__, sets))
+                cheapest_split[item] = split
+                additional += split
+
+        # Dirty items are already calculated with the new parts, so the checks below don't change them
+        for items, previous, split in changed_sets:
+            for item in items:
+                current = cheapest_split[item]
+                if split < current:
+                    cheapest_split[item] = split
+                    additional += split - current
+                elif previous == current:  # the set could be the cheapest one, and it went up
+                    cheapest = min(map(last_split.__getitem__, item2sets[item]))
+                    cheapest_split[item] = cheapest
+                    additional += cheapest - current
+
+        dirty_items.clear()
+        state.dirty_sets.clear()
+
+        self.additional = additional
+        self.calls += 1
+        if self.calls % RESYNC_PERIOD == 0:
+            self.recalc_all(state)
+        return ceil_with_tolerance(state.current_cost + self.additional)
+
+    def get_optimistic_from_scratch(self, state):
         # split every set on the not covered items and choose the cheapest one for every item
-        splitted_costs = {set_idx: self.set_costs[set_idx] / len(items)
-                          for set_idx, items in state.set2items.iteritems()
-                          if items}
-        additional = sum(min(splitted_costs[set_idx] for set_idx in sets)
-                         for item, sets in state.item2sets.iteritems())
-        return ceil(state.current_cost + additional)
+        set_costs = self.set_costs
+        splitted_costs = {set_idx: set_costs[set_idx] / len(items) for set_idx, items in state.set2items.iteritems() if items}
+        additional = sum(min(map(splitted_costs.__getitem__, sets)) for sets in state.item2sets.itervalues())
+        return ceil_with_tolerance(state.current_cost + additional)
+
+    def recalc_all(self, state):
+        last_split = self.last_split
+        self.cheapest_split = {item: min(map(last_split.__getitem__, sets))
+                               for item, sets in state.item2sets.iteritems()}
+        self.additional = sum(self.cheapest_split.itervalues())
+        state.dirty_items.clear()
+        state.dirty_sets.clear()
 
     def cost_of_chosen_list(self, chosen_sets):
         return sum(self.set_costs[s_idx] for s_idx in chosen_sets)
@@ -25,7 +122,15 @@ class Estimator(object):
 
     def pick_a_set(self, state):
         # Pick a set, basing on covering and the cost
-        item_weights = {idx: 1.0 / len(sets)  # The lesser candidates has item, the more critical item is
-                        for idx, sets in state.item2sets.iteritems()}
-        return max(state.set2items.iteritems(),
-                   key=lambda (s_idx, items): sum(item_weights[i] for i in items) / self.set_costs[s_idx])[0]
+        # The lesser candidates has item, the more critical item is
+        item_weights = {idx: 1.0 / len(sets) for idx, sets in state.item2sets.iteritems()}
+        set_costs = self.set_costs
+
+        def score(set_and_items):
+            set_idx, items = set_and_items
+            weight = sum(map(item_weights.__getitem__, items))
+            cost = set_costs[set_idx]
+            return weight / cost if cost else float('inf')  # a free set covers its items for nothing
+
+        # Ties go to the first set in set2items
+        return max(state.set2items.iteritems(), key=score)[0]
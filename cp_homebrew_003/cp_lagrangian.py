@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Lagrangian lower bound for the nodes of the search.
+
+We relax the cover constraints  sum_j a_ij x_j >= 1  with multipliers u_i >= 0:
+
+    L(u) = sum_i u_i + sum_j min(0, c_j - sum_{i in j} u_i)
+
+L(u) doesn't exceed the cost of the cheapest cover of the not covered items for any u,
+so it is a valid bound. Subgradient steps move u towards the best bound.
+A child starts from the multipliers of its parent, so a few steps are enough there.
+"""
+import numpy as np
+
+from cp_estimator import ceil_with_tolerance
+
+ROOT_ITERATIONS = 300  # steps at the first call, when there are no multipliers to start from
+NODE_ITERATIONS = 15   # steps at the other nodes
+STEP_SCALE = 2.0       # initial scale of the Polyak step, it is halved when the bound doesn't improve
+PATIENCE = 5           # steps without improvement before the scale is halved
+
+
+class LagrangianBound(object):
+    def __init__(self, matrix, metrics=None):
+        """
+        :param cp_matrix.Matrix matrix:
+        :param dict metrics:
+        """
+        self.matrix = matrix
+        self.item_count = matrix.item_count
+        self.set_count = matrix.set_count
+        self.costs = matrix.costs
+
+        # Cheapest split of the item over the sets is a good start (see Estimator.get_optimistic)
+        sizes = np.bincount(matrix.pair_sets, minlength=self.set_count)
+        self.initial = np.full(self.item_count, np.inf)
+        np.minimum.at(self.initial, matrix.pair_items, (self.costs / np.maximum(sizes, 1))[matrix.pair_sets])
+        self.initial[np.isinf(self.initial)] = 0.0
+
+        self.stack = []  # [(depth, multipliers)] - best multipliers of the ancestors of the current node
+        self.metrics = {} if metrics is None else metrics  # we can share the dict with Estimator
+        self.metrics.update(lagrangian_calls=0, lagrangian_cuts=0)
+
+    def get_bound(self, state, upper_bound):
+        """
+        :param cp_state.State state:
+        :param float upper_bound: cost of the best known solution, we stop as soon as the bound reaches it
+        :return float: lower bound of the cost of any full cover below the state
+        """
+        self.metrics['lagrangian_calls'] += 1
+        depth = len(state.decisions)
+        while self.stack and self.stack[-1][0] >= depth:  # multipliers of the finished subtrees
+            self.stack.pop()
+        if self.stack:
+            multipliers, iterations = self.stack[-1][1], NODE_ITERATIONS
+        else:
+            multipliers, iterations = self.initial, ROOT_ITERATIONS
+
+        # The subproblem: not covered items and the sets without decision, that can cover them
+        live_sets, live_items, sets, items = self.matrix.live(state)
+
+        target = upper_bound - state.current_cost  # the remaining cost of the best known solution
+        multipliers = np.where(live_items, multipliers, 0.0)
+        best_bound, best_multipliers = -np.inf, multipliers
+        scale, stalled = STEP_SCALE, 0
+        for _ in xrange(iterations):
+            reduced_costs = self.costs - np.bincount(sets, weights=multipliers[items], minlength=self.set_count)
+            chosen = live_sets & (reduced_costs < 0)
+            bound = multipliers.sum() + reduced_costs[chosen].sum()
+            if bound > best_bound:
+                best_bound, best_multipliers, stalled = bound, multipliers, 0
+                if ceil_with_tolerance(state.current_cost + bound) >= upper_bound:
+                    break  # enough to prune the node
+            else:
+                stalled += 1
+                if stalled >= PATIENCE:
+                    scale, stalled = scale / 2, 0
+
+            # Subgradient: how much each item is undercovered by the sets with negative reduced cost
+            gradient = 1.0 - np.bincount(items[chosen[sets]], minlength=self.item_count)
+            gradient[~live_items | ((multipliers <= 0) & (gradient < 0))] = 0.0
+            norm = gradient.dot(gradient)
+            if norm == 0:
+                break  # chosen sets cover every item exactly once: no better multipliers exist
+            multipliers = np.maximum(multipliers + scale * (target - bound) / norm * gradient, 0.0)
+
+        self.stack.append((depth, best_multipliers))
+        bound = ceil_with_tolerance(state.current_cost + best_bound)
+        if bound >= upper_bound:
+            self.metrics['lagrangian_cuts'] += 1
+        return bound
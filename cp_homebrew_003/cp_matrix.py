@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+The task as NumPy arrays of (set, item) pairs, for vectorized calculations over the state.
+
+State keeps only the dicts. But the live part of the matrix is easy to restore from them:
+a pair is live if its set is in set2items and its item is in item2sets.
+"""
+import numpy as np
+
+
+class Matrix(object):
+    def __init__(self, task):
+        self.item_count = task.item_count
+        self.set_count = task.set_count
+        self.costs = np.array([s.cost for s in task.sets], dtype=float)
+
+        # (set, item) pairs sorted by set, without duplicated items
+        sizes = [len(s.items) for s in task.sets]
+        pair_sets = np.repeat(np.arange(self.set_count), sizes)
+        pair_items = np.concatenate([s.items for s in task.sets if s.items]).astype(int)
+        keys = np.unique(pair_sets * self.item_count + pair_items)
+        self.pair_sets = keys // self.item_count
+        self.pair_items = keys % self.item_count
+
+    def live(self, state):
+        """
+        :param cp_state.State state:
+        :return (np.ndarray, np.ndarray, np.ndarray, np.ndarray): masks of the live sets and items
+            and the sets and items of the live pairs
+        """
+        live_sets = np.zeros(self.set_count, dtype=bool)
+        live_sets[np.fromiter(state.set2items, dtype=int, count=len(state.set2items))] = True
+        live_items = np.zeros(self.item_count, dtype=bool)
+        live_items[np.fromiter(state.item2sets, dtype=int, count=len(state.item2sets))] = True
+        live_pairs = live_sets[self.pair_sets] & live_items[self.pair_items]
+        return live_sets, live_items, self.pair_sets[live_pairs], self.pair_items[live_pairs]
@@ -3,8 +3,13 @@
 import sys
 from time import time as now
 
+from cp_lagrangian import LagrangianBound
 from cp_state import State
 
+# The Lagrangian bound costs a few subgradient steps per node. It pays off from this count of sets on
+# (sc_157_0, sc_330_0, sc_1000_11), on smaller tasks the cheap bound is as good per second
+LAGRANGIAN_MIN_SETS = 150
+
 
 class Solution(object):
     def __init__(self, task):
@@ -18,11 +23,8 @@ class Solution(object):
         if state.current_cost < self.best_cost:
             print self.steps, 'update solution to', state.current_cost  # uncomment this to see the progress
             solution = [0] * self.set_count
-            state_on_stack = state
-            while state_on_stack:
-                for s in state_on_stack.chosen_sets:
-                    solution[s] = 1
-                state_on_stack = state_on_stack.parent
+            for s in state.chosen_sets:
+                solution[s] = 1
 
             self.best_solution = solution
             self.best_cost = state.current_cost
@@ -32,40 +34,54 @@ class Solution(object):
             self.best_cost, self.proven_as_optimal, self.steps, self.best_solution)
 
 
-def deep_search(task, timeout=10*60):
+def deep_search(task, timeout=10*60, lagrangian=None):
+    # lagrangian: whether to try the Lagrangian bound, None - on the tasks of LAGRANGIAN_MIN_SETS sets or more
     state = State.from_task(task)
     solution = Solution(task)
     solution.metrics = state.estimator.metrics
+    if lagrangian is None:
+        lagrangian = task.set_count >= LAGRANGIAN_MIN_SETS
+    lagrangian_bound = LagrangianBound(state.estimator.matrix, solution.metrics) if lagrangian else None
     deadline = now() + timeout
 
     # Python has no tail-recursion optimization.
     # Even more, python has a limit on recursion depth
     # So, we need to write big loops iteratively
+    # There is only one state object. We move it down and up the tree, applying and reverting decisions
 
-    while state:  # when we try to .negate() init state we will obtain None and will exit from the loop
+    explored = False
+    while not explored:  # when we try to .negate() init state we will obtain False and will exit from the loop
         solution.steps += 1
         if not state.is_feasible:
-            state = state.parent
+            explored = not state.negate()  # no solutions here, try to deselect the last chosen set
             continue
 
         if state.is_all_covered():
             solution.store_result(state)
-            state = state.negate()  # try to deselect the current set or rollback to the parent state
+            explored = not state.negate()  # try to deselect the current set or rollback to the parent state
             continue
 
-        if state.get_optimistic_cost() >= solution.best_cost:
+        if state.get_optimistic_cost() >= solution.best_cost or \
+                is_pruned_by_lagrangian(lagrangian_bound, state, solution):
             if now() > deadline:  # we get to this place often enough to stop in time,
                                   # and we get to it not on the each iteration, so we will not check the time too frequently
                 return solution
-            state = state.negate()  # try to deselect the current set or rollback to the parent state
+            explored = not state.negate()  # try to deselect the current set or rollback to the parent state
             continue
 
-        state = state.next_child()
+        state.next_child()
 
     solution.proven_as_optimal = True  # we have not terminated on timeout, so we have explored all the tree
     return solution
 
 
+def is_pruned_by_lagrangian(lagrangian_bound, state, solution):
+    # The cheap bound has not pruned the node, try the stronger (and more expensive) one
+    if lagrangian_bound is None or solution.best_solution is None:
+        return False  # nothing to compare with
+    return lagrangian_bound.get_bound(state, solution.best_cost) >= solution.best_cost
+
+
 if __name__ == '__main__':
     from reader import read_input
     for fn in ['sc_157_0', 'sc_330_0', 'sc_1000_11', 'sc_5000_1', 'sc_10000_5', 'sc_10000_2']:
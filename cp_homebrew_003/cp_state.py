@@ -6,30 +6,24 @@ from cp_estimator import Estimator
 
 
 class State(object):
-    def __init__(self, estimator, set2items, item2sets,
-                 parent=None, picked_set=None, decision=None):
+    """
+    The single mutable state of the search.
+
+    Instead of copying set2items and item2sets for every child, we change them in place
+    and write to the trail how to revert every change. A decision remembers the trail length,
+    so going back costs only the count of changes made since then, not the size of the task.
+    """
+    def __init__(self, estimator, set2items, item2sets):
         # Don't use this constructor directly. Use .from_task() instead
         self.estimator = estimator  # just copy the pointer from the parent for fast access
         self.set2items = set2items  # {set_index: set(indexes of not covered items)}
         self.item2sets = item2sets  # {item_index: set(indexes of sets that can cover the item and have no decision yet)}
-        self.parent = parent        # parent state object
-        self.picked_set = picked_set  # picked set index
-        self.decision = decision    # whether we build picked_set or not
+        self.trail = []             # [(function, args)] - calls that revert the changes, in order of changes
+        self.decisions = []         # [(picked_set, decision, trail_length, current_cost, chosen_count)] - on the moment of the decision
+        self.chosen_sets = []       # indexes of all sets chosen so far (by decisions and by propagation)
+        self.current_cost = 0
         self.is_feasible = True
-        if decision:
-            self.chosen_sets = {picked_set}
-        else:
-            self.chosen_sets = set()
-        self.propagate_constaints()
-        if self.is_feasible:
-            self.recalc_cost()
-
-    def recalc_cost(self):
-        additional = self.estimator.cost_of_chosen_list(self.chosen_sets)
-        if self.parent is None:
-            self.current_cost = additional
-        else:
-            self.current_cost = self.parent.current_cost + additional
+        self.propagate(set(item2sets))
 
     @classmethod
     def from_task(cls, task):
@@ -42,124 +36,121 @@ class State(object):
             for item_idx in set_items:
                 item2sets[item_idx].add(set_idx)
 
-        return cls(estimator, set2items, dict(item2sets),
-                   parent=None, picked_set=None, decision=False)
+        state_class = TrackedState if estimator.incremental else cls
+        return state_class(estimator, set2items, dict(item2sets))
 
     def __repr__(self):
-        return 'State(picked={},chosen={})'.format(self.picked_set, self.decision)
+        if self.decisions:
+            picked_set, decision = self.decisions[-1][:2]
+        else:
+            picked_set, decision = None, False
+        return 'State(picked={},chosen={},depth={})'.format(picked_set, decision, len(self.decisions))
 
     # Search
 
     def next_child(self):
+        # Go down: choose the most promising set
         picked_set = self.estimator.pick_a_set(self)
-        return self.create_child(picked_set, decision=True)
-
-    def create_child(self, picked_set, decision):
-        set2items = {s: i.copy() for s, i in self.set2items.iteritems()}  # Copy for mutating in child state
-        item2sets = {i: s.copy() for i, s in self.item2sets.iteritems()}  # TODO: Copy is expensive. Can we avoid it?
-        return self.__class__(self.estimator, set2items, item2sets,
-                              parent=self, picked_set=picked_set, decision=decision)
+        self.push_decision(picked_set, decision=True)
+        self.choose_sets([picked_set])
 
     def negate(self):
-        # Generate sibling state, where picked_set is not chosen
-        # If we already there, rollback to the parent state and repeat on it
-        state = self
-        while state:
-            if state.decision:
-                return state.parent.create_child(state.picked_set, decision=False)
-            else:
-                state = state.parent
-        return None # if we have eventually got stat = None, it means that we are reached initial state
+        # Go to the sibling state, where the last chosen set is not chosen
+        # If we already there, rollback to the parent decision and repeat on it
+        # Returns False if we are reached initial state, i.e. the whole tree is explored
+        while self.decisions:
+            picked_set, decision, trail_length, current_cost, chosen_count = self.decisions.pop()
+            self.rollback(trail_length)
+            self.current_cost = current_cost
+            del self.chosen_sets[chosen_count:]
+            self.is_feasible = True
+            if decision:
+                self.push_decision(picked_set, decision=False)
+                self.propagate(set(self.toss_set(picked_set)))
+                return True
+        return False
+
+    def push_decision(self, picked_set, decision):
+        self.decisions.append((picked_set, decision, len(self.trail), self.current_cost, len(self.chosen_sets)))
+
+    def rollback(self, trail_length):
+        trail = self.trail
+        while len(trail) > trail_length:
+            function, args = trail.pop()
+            function(*args)
+
+    # Changes, that can be reverted
+
+    def pop_set(self, set_idx):
+        items = self.set2items.pop(set_idx)
+        self.trail.append((self.set2items.__setitem__, (set_idx, items)))
+        return items
+
+    def pop_item(self, item_idx):
+        sets = self.item2sets.pop(item_idx)
+        self.trail.append((self.item2sets.__setitem__, (item_idx, sets)))
+        return sets
+
+    def discard_set_of_item(self, item_idx, set_idx):
+        sets = self.item2sets[item_idx]
+        sets.remove(set_idx)
+        self.trail.append((sets.add, (set_idx,)))
+        return sets
+
+    def discard_items_of_set(self, set_idx, items_to_remove):
+        items = self.set2items[set_idx]
+        removed = items & items_to_remove
+        items -= removed
+        self.trail.append((items.update, (removed,)))
+        return items
+
+    def choose_sets(self, sets):
+        for s in sets:
+            self.chosen_sets.append(s)
+            self.current_cost += self.estimator.cost_of_chosen(s)
+        self.on_sets_chosen(sets)
+
+    def toss_set(self, set_idx):
+        # Returns the items, that have lost the set as a candidate
+        orphaned_items = self.pop_set(set_idx)
+        for item_idx in orphaned_items:
+            sets = self.discard_set_of_item(item_idx, set_idx)
+            if not sets:
+                self.is_feasible = False
+                # We can't cover the item.
+                # No matter, what else. State doesn't lead to any feasible solutions
+                break
+        return orphaned_items
 
     # Constraints propagation
 
-    def propagate_constaints(self):
-        if self.decision:
-            self.propagate_on_choice()
-        else:
-            self.propagate_on_toss()
-
-    def propagate_on_choice(self):
-        self.on_sets_chosen(self.chosen_sets)  # there is only one set in chosen_sets (picked_set)
-
-    def propagate_on_toss(self):
-        if self.picked_set is not None:  # "if we are not at the init state"
-            orphaned_items = self.set2items.pop(self.picked_set)
-            for item_idx in orphaned_items:
-                sets = self.item2sets[item_idx]
-                sets.remove(self.picked_set)
-                if not sets:
-                    self.is_feasible = False
-                    # We can't cover the item.
-                    # No matter, what else. State doesn't lead to any feasible solutions
-                    return
-
-            # before = len(self.set2items)
-            # self.remove_expensive_subsets(orphaned_items,  # Too expensive calculations :o(
-            #                               self.estimator.cost_of_chosen(self.picked_set))
-            # after = len(self.set2items)
-            # if after != before:
-            #     self.estimator.metrics['cut_exp'] += 1
-            # else:
-            #     self.estimator.metrics['not_cut_exp'] += 1
-            # if not self.is_feasible:
-            #     self.estimator.metrics['rollback_exp'] += 1
-            #     return
-
-        # Immediately set 1 for every set that can't be replaced with another set
-        required_sets = self.detect_required_sets()
-        self.chosen_sets.update(required_sets)
-        self.on_sets_chosen(required_sets)
-
-    def detect_required_sets(self):
-        required_sets = set()
-        for item, sets in self.item2sets.iteritems():
-            if len(sets) == 1:  # only one set can cover this item
-                required_sets.update(sets)
-        return required_sets
+    def propagate(self, items_to_check):
+        """
+        Choose the only candidate set of an item (or find out, that the state is infeasible).
+        A chosen set takes no candidates from the items left, so one pass is enough
+        :param set items_to_check: items, that have lost some candidate sets
+        """
+        if not self.is_feasible:
+            return
+        for item_idx in items_to_check:
+            sets = self.item2sets.get(item_idx)
+            if sets is not None and len(sets) == 1:  # only one set can cover this item
+                self.choose_sets(list(sets))
 
     def on_items_covered(self, to_remove):
         overvalued_sets = set()
         for item in to_remove:
-            overvalued_sets.update(self.item2sets.pop(item))
+            overvalued_sets.update(self.pop_item(item))
 
         for s in overvalued_sets & set(self.set2items):
-            items = self.set2items[s]
-            items -= to_remove
+            items = self.discard_items_of_set(s, to_remove)
             if not items:
-                del self.set2items[s]
-
-        #before = len(self.set2items)
-        #self.remove_redundant_sets(overvalued_sets & set(self.set2items))  # expensive operation. Work good only on the large datasets
-        #after = len(self.set2items)
-        #if after < before:
-        #    print 'profit {}->{}'.format(before, after)
-
-    def remove_expensive_subsets(self, items, cost_limit):
-        # We can cover items with the cost=cost_limit
-        # But we don't do that. So, we don't want to cover the items with the more expensive sets
-        costs = self.estimator.set_costs
-
-        iter_items = iter(items)
-        candidates = list(self.item2sets[next(iter_items)])
-
-        for cand_idx in candidates:
-            if costs[cand_idx] >= cost_limit:
-                cand_items = self.set2items[cand_idx]
-                if len(cand_items) <= len(items) and cand_items <= items:
-                    del self.set2items[cand_idx]
-
-                    for item_idx in cand_items:
-                        sets = self.item2sets[item_idx]
-                        sets.remove(cand_idx)
-                        if not sets:
-                            self.is_feasible = False
-                            return  # We cant cover the item
+                self.pop_set(s)
 
     def on_sets_chosen(self, sets):
         covered_items = set()
         for s in sets:
-            covered_items.update(self.set2items.pop(s))
+            covered_items.update(self.pop_set(s))
 
         self.on_items_covered(covered_items)
 
@@ -179,3 +170,65 @@ if __name__ == '__main__':
     # st = now()
     # state.remove_redundant_sets()
     # print now() - st
+
+
+class TrackedState(State):
+    """
+    State for the incremental bound of the estimator (see Estimator.get_optimistic()).
+
+    Every change (and its reverting) marks the touched items or sets as dirty, so the estimator
+    updates only them. Reverting calls Python methods instead of the builtin ones, so it is used
+    only when the estimator is incremental.
+    """
+    def __init__(self, estimator, set2items, item2sets):
+        self.dirty_items = set(item2sets)  # items, that have got or lost candidate sets since the estimator has seen them
+        self.dirty_sets = set()            # sets, that have got or lost not covered items since the estimator has seen them
+        self.candidates_count = sum(len(sets) for sets in item2sets.itervalues())  # size of item2sets in total
+        super(TrackedState, self).__init__(estimator, set2items, item2sets)
+
+    def pop_set(self, set_idx):
+        # Its items will be covered or lose the set as a candidate, they will be marked there
+        items = self.set2items.pop(set_idx)
+        self.trail.append((self.restore_set, (set_idx, items)))
+        return items
+
+    def restore_set(self, set_idx, items):
+        self.set2items[set_idx] = items
+        self.dirty_sets.add(set_idx)
+
+    def pop_item(self, item_idx):
+        sets = self.item2sets.pop(item_idx)
+        self.dirty_items.add(item_idx)
+        self.candidates_count -= len(sets)
+        self.trail.append((self.restore_item, (item_idx, sets)))
+        return sets
+
+    def restore_item(self, item_idx, sets):
+        self.item2sets[item_idx] = sets
+        self.dirty_items.add(item_idx)
+        self.candidates_count += len(sets)
+
+    def discard_set_of_item(self, item_idx, set_idx):
+        sets = self.item2sets[item_idx]
+        sets.remove(set_idx)
+        self.dirty_items.add(item_idx)
+        self.candidates_count -= 1
+        self.trail.append((self.restore_set_of_item, (item_idx, set_idx)))
+        return sets
+
+    def restore_set_of_item(self, item_idx, set_idx):
+        self.item2sets[item_idx].add(set_idx)
+        self.dirty_items.add(item_idx)
+        self.candidates_count += 1
+
+    def discard_items_of_set(self, set_idx, items_to_remove):
+        items = self.set2items[set_idx]
+        removed = items & items_to_remove
+        items -= removed
+        self.dirty_sets.add(set_idx)  # the set is more expensive per item now
+        self.trail.append((self.restore_items_of_set, (set_idx, items, removed)))
+        return items
+
+    def restore_items_of_set(self, set_idx, items, removed):
+        items.update(removed)
+        self.dirty_sets.add(set_idx)
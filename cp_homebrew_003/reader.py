@@ -5,31 +5,24 @@ import os
 import re
 import sys
 
-Set = namedtuple("Set", ['index', 'cost', 'items'])
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common import instance as csr
+from common.cache import load_instance
+from common.instance import Set
+
 Task = namedtuple('Task', ['item_count', 'set_count', 'sets'])
 
 DATA_ROOT = os.path.realpath(os.path.join(__file__, '../../data'))
 
 
 def parse_input(input_data):
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
-
-    sets = []
-    for idx, line in enumerate(lines[1:set_count+1]):
-        parts = line.split()
-        sets.append(Set(idx, float(parts[0]), map(int, parts[1:])))
-
-    return Task(item_count, set_count, sets)
+    instance = csr.parse_input(input_data)
+    return Task(instance.item_count, instance.set_count, csr.to_sets(instance))
 
 
 def read_input(filename):
-    path =  os.path.join(DATA_ROOT, filename)
-    with open(path) as f:
-        return parse_input(f.read())
+    instance = load_instance(os.path.join(DATA_ROOT, filename))  # memory-mapped binary sidecar after the first read
+    return Task(instance.item_count, instance.set_count, csr.to_sets(instance))
 
 
 def get_size(filename):
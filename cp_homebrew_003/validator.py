@@ -3,21 +3,34 @@
 """
 For local testing purposes
 """
-from itertools import compress, chain, product, ifilter
+import os
+import sys
+from itertools import compress, product, ifilter
 from functools import partial
 
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
 from reader import read_input, list_files
+from common.bitset import full_mask, items_to_mask, union
 
 
-def is_valid(task, solution):
+def get_masks(task):
+    """
+    :param reader.Task task:
+    :return list[int]: bitset of covered items for every set, see common/bitset.py
+    """
+    return [items_to_mask(s.items) for s in task.sets]
+
+
+def is_valid(task, solution, masks=None):
     """
     :param reader.Task task:
     :param list[1|0] solution:
+    :param list[int] masks: result of get_masks(task). Pass it when you check many solutions of the same task
     :return bool: whether constraints in task are met
     """
-    sets = compress(task.sets, solution)
-    items_covered = set(chain.from_iterable(s.items for s in sets))
-    return len(items_covered) == task.item_count
+    if masks is None:
+        masks = get_masks(task)
+    return union(masks, solution) == full_mask(task.item_count)
 
 
 def calc_cost(task, solution):
@@ -40,7 +53,7 @@ def bruteforce_solver(task):
     """
     all_configurations = product([0, 1], repeat=task.set_count)
 
-    valid_configurations = ifilter(partial(is_valid, task), all_configurations)
+    valid_configurations = ifilter(partial(is_valid, task, masks=get_masks(task)), all_configurations)
 
     return min(valid_configurations, key=partial(calc_cost, task))
 
@@ -10,38 +10,49 @@ from __future__ import division
 from __future__ import print_function
 
 from ortools.sat.python import cp_model
+import argparse
+import os
 import time
-from collections import namedtuple, defaultdict
-
-Set = namedtuple("Set", ['index', 'cost', 'items'])
 import sys
-import numpy as np
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.greedy import lazy_greedy
+from common.instance import parse_input, to_sets
+from common.postopt import remove_redundant_sets
 
 
 
 def reader(input_data):
-    lines = input_data.split('\n')
+    instance = parse_input(input_data)
+    return to_sets(instance), instance.item_count, instance.set_count
 
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
 
-    sets = []
-    for i in range(1, set_count+1):
-        parts = lines[i].split()
-        sets.append(Set(i-1, float(parts[0]), set(map(int, parts[1:]))))
-    return sets, item_count, set_count
+def greedy_hint(instance):
+    """
+    A fast feasible cover to start CP-SAT from.
+    :param common.instance.Instance instance:
+    :return list[1|0]:
+    """
+    solution = [0]*instance.set_count
+    for s in lazy_greedy(instance):
+        solution[s] = 1
+    return remove_redundant_sets(instance, solution)
 
 # You need to subclass the cp_model.CpSolverSolutionCallback class.
 class VarArrayAndObjectiveSolutionPrinter(cp_model.CpSolverSolutionCallback):
-    """Print intermediate solutions."""
+    """Print intermediate solutions and pass the improving ones to the sink."""
 
-    def __init__(self, variables):
+    def __init__(self, variables, sink=None):
+        """
+        :param sink: callable(obj, solution), see common/sinks.py
+        """
         cp_model.CpSolverSolutionCallback.__init__(self)
         self.__variables = variables
         self.__solution_count = 0
         self.start = time.time()
         self.start_interval = time.time()
+        self.sink = sink
+        self.best_obj = None
+        self.best_solution = None
 
     def on_solution_callback(self):
         t1 = time.time()
@@ -55,40 +66,62 @@ class VarArrayAndObjectiveSolutionPrinter(cp_model.CpSolverSolutionCallback):
         #print()
         self.__solution_count += 1
 
+        obj = self.ObjectiveValue()
+        if self.best_obj is None or obj < self.best_obj:
+            self.best_obj = obj
+            self.best_solution = [self.Value(v) for v in self.__variables]
+            if self.sink is not None:
+                self.sink(obj, self.best_solution)
+
     def solution_count(self):
         return self.__solution_count
 
 
-def solver(set_count, item_count, sets, max_minutes=10):
+def solver(set_count, item_count, sets, max_minutes=10, hint=None, num_search_workers=None, sink=None):
+    """
+    :param float max_minutes: time limit
+    :param list[1|0] hint: a solution to start the search from, e.g. greedy_hint()
+    :param int num_search_workers: count of parallel workers of CP-SAT (None - its default)
+    :param sink: callable(obj, solution), gets every improving solution as soon as it is found
+        (see common/sinks.py), so the run can be killed at any time
+    """
     setrange = range(set_count)
     itemrange = range(item_count)
-    have_item = np.zeros([set_count, item_count], dtype ='int')
     cost = [int(s.cost) for s in sets]
-    max_cost = sum(cost)
 
     # Creates the model.
     model = cp_model.CpModel()
 
     # Creates the variables.
     x = [0]*set_count
-    for s in setrange:
-        for i in sets[s].items:
-            have_item[s,i] = 1
     for s in setrange:
         x[s] = model.NewBoolVar('x%s'%(s))
 
+    # Inverted index: the sets, that cover every item. So the model is as large as the count of nonzeros
+    covered_by = [[] for i in itemrange]
+    for s in setrange:
+        for i in set(sets[s].items):
+            covered_by[i].append(x[s])
+
     # Creates the constraints.
-    for i in itemrange: 
-        model.Add(sum(have_item[s][i]*x[s] for s in setrange) >= 1)
+    for i in itemrange:
+        model.AddBoolOr(covered_by[i])
 
     # Creates the objective,    
     model.Minimize(sum(cost[s]*x[s] for s in setrange))
 
+    # Starts from the given solution, CP-SAT repairs it if it is not feasible
+    if hint is not None:
+        for s in setrange:
+            model.AddHint(x[s], int(hint[s]))
+
     # Creates a solver and solves.
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = 60*max_minutes
-    solution_printer = VarArrayAndObjectiveSolutionPrinter(x)
-    status = solver.SolveWithSolutionCallback(model, solution_printer)
+    if num_search_workers is not None:
+        solver.parameters.num_search_workers = num_search_workers
+    solution_printer = VarArrayAndObjectiveSolutionPrinter(x, sink)
+    status = solver.Solve(model, solution_printer)
     print('----------------')
     print('Status       : %s' % solver.StatusName(status))
     print('#sol found   : %i' % solution_printer.solution_count())
@@ -110,9 +143,12 @@ def solver(set_count, item_count, sets, max_minutes=10):
     return obj, is_optimal, solution
 
 if __name__ == '__main__':
-    if len(sys.argv) > 1:
-        file_location = sys.argv[1].strip()
-        with open(file_location, 'r') as input_data_file:
-            input_data = input_data_file.read()
-            sets, item_count, set_count = reader(input_data)
-    obj, is_optimal, solution = solver(set_count, item_count, sets, max_minutes=1)
+    parser = argparse.ArgumentParser(description='Solve an instance with OR-tools CP-SAT, without presolve')
+    parser.add_argument('file', help='the instance, e.g. ../data/sc_6_1')
+    parser.add_argument('--minutes', type=float, default=10, help='the time limit')
+    parser.add_argument('--workers', type=int, default=None, help='count of parallel workers (default: the CP-SAT one)')
+    args = parser.parse_args()
+    with open(args.file.strip(), 'r') as input_data_file:
+        instance = parse_input(input_data_file.read())
+    obj, is_optimal, solution = solver(instance.set_count, instance.item_count, to_sets(instance), max_minutes=args.minutes,
+                                       hint=greedy_hint(instance), num_search_workers=args.workers)
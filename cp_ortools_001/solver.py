@@ -9,29 +9,36 @@
 #install ortools: for Python 2.7 or 3.5+ installed:
 #python -m pip install --upgrade --user ortools
 
-import time
-from collections import namedtuple, defaultdict
-from ortools_solver import solver
-
-Set = namedtuple("Set", ['index', 'cost', 'items'])
-
-def solve_it(input_data):
+import argparse
+import os
+import sys
+from ortools_solver import greedy_hint, solver
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.instance import parse_input, to_sets
+from common.presolve import postsolve, presolve
+from common.sinks import FileSink, PostsolveSink
+
+def solve_it(input_data, sink=None, max_minutes=10, num_search_workers=None):
+    """
+    :param sink: callable(obj, solution), gets every improving solution of the original instance,
+        e.g. common.sinks.FileSink
+    :param float max_minutes: time limit of CP-SAT
+    :param int num_search_workers: count of parallel workers of CP-SAT (None - its default, as many as the cores)
+    """
     # Modify this code to run your optimization algorithm
 
-    # parse the input
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
-    
-    sets = []
-    for i in range(1, set_count+1):
-        parts = lines[i].split()
-        sets.append(Set(i-1, float(parts[0]), set(map(int, parts[1:]))))
+    # parse the input and reduce it (see common/presolve.py)
+    instance, reduction = presolve(parse_input(input_data))
 
     #ortools
-    obj, is_optimal, solution = solver(set_count, item_count, sets, max_minutes=10)
+    if instance.item_count > 0:
+        obj, is_optimal, solution = solver(instance.set_count, instance.item_count, to_sets(instance), max_minutes=max_minutes,
+                                           hint=greedy_hint(instance), num_search_workers=num_search_workers,
+                                           sink=PostsolveSink(sink, reduction) if sink is not None else None)
+    else:  # presolve has fixed everything
+        obj, is_optimal, solution = 0, 1, []
+    obj += reduction.fixed_cost
+    solution = postsolve(reduction, solution)
 
     output_data = str(obj) + ' ' + str(is_optimal) + '\n'
     output_data += ' '.join(map(str, solution))
@@ -40,13 +47,13 @@ def solve_it(input_data):
 
 
 if __name__ == '__main__':
-    import sys
-    if len(sys.argv) > 1:
-        file_location = sys.argv[1].strip()
-        with open(file_location, 'r') as input_data_file:
-            input_data = input_data_file.read()
-        result = solve_it(input_data)
-        print(result)
-    else:
-        print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/sc_6_1)')
-
+    parser = argparse.ArgumentParser(description='Solve an instance with OR-tools CP-SAT')
+    parser.add_argument('file', help='the instance, e.g. ../data/sc_6_1')
+    parser.add_argument('sink', nargs='?', help='a file to keep the best solution so far in')
+    parser.add_argument('--minutes', type=float, default=10, help='the time limit')
+    parser.add_argument('--workers', type=int, default=None, help='count of parallel workers (default: the CP-SAT one)')
+    args = parser.parse_args()
+    with open(args.file.strip(), 'r') as input_data_file:
+        input_data = input_data_file.read()
+    sink = FileSink(args.sink.strip()) if args.sink else None
+    print(solve_it(input_data, sink, args.minutes, args.workers))
@@ -24,24 +24,20 @@
 # THE SOFTWARE.
 
 
-from collections import namedtuple
-
-Set = namedtuple("Set", ['index', 'cost', 'items'])
+import os
+import sys
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.instance import parse_input, to_sets
+from common.postopt import remove_redundant_sets
 
 def solve_it(input_data):
     # Modify this code to run your optimization algorithm
 
     # parse the input
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
-    
-    sets = []
-    for i in range(1, set_count+1):
-        parts = lines[i].split()
-        sets.append(Set(i-1, float(parts[0]), map(int, parts[1:])))
+    instance = parse_input(input_data)
+    item_count = instance.item_count
+    set_count = instance.set_count
+    sets = to_sets(instance)
 
     # build a trivial solution
     # pick add sets one-by-one until all the items are covered
@@ -54,7 +50,10 @@ def solve_it(input_data):
         covered |= set(s.items)
         if len(covered) >= item_count:
             break
-        
+
+    # drop the sets whose items are all covered by the other picked sets
+    solution = remove_redundant_sets(instance, solution)
+
     # calculate the cost of the solution
     obj = sum([s.cost*solution[s.index] for s in sets])
 
@@ -24,41 +24,37 @@
 # THE SOFTWARE.
 
 
-from collections import namedtuple
+import os
+import sys
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.greedy import lazy_greedy
+from common.instance import parse_input, to_sets
+from common.postopt import remove_redundant_sets
+
 
-Set = namedtuple("Set", ['index', 'cost', 'items'])
+def score(cost, new_items):
+    # prefer the sets that bring the most (cost x not covered items)
+    return -cost*new_items
 
 def solve_it(input_data):
     # Modify this code to run your optimization algorithm
 
     # parse the input
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
-    
-    sets = []
-    for i in range(1, set_count+1):
-        parts = lines[i].split()
-        sets.append(Set(i-1, float(parts[0]), map(int, parts[1:])))
-
-    # build a trivial solution
-    # pick add sets one-by-one until all the items are covered
+    instance = parse_input(input_data)
+    item_count = instance.item_count
+    set_count = instance.set_count
+    sets = to_sets(instance)
+
+    # build a greedy solution
+    # pick sets one-by-one until all the items are covered, every time the best one by score()
+    # a heap with lazy re-scoring gives the same picks as re-sorting all the sets on every step
     solution = [0]*set_count
-    covered = set()
-    
-    while len(covered) < item_count:
-        sorted_sets = sorted(sets, key=lambda s: -s.cost*len(set(s.items)-covered) if len(set(s.items)-covered) > 0 else s.cost)
-        #print covered
-        #print [-s.cost*len(set(s.items)-covered) for s in sorted_sets]
-        #print sorted_sets
-        for s in sorted_sets:
-            if solution[s.index] < 1:
-                solution[s.index] = 1
-                covered |= set(s.items)
-                break;
-        
+    for s in lazy_greedy(instance, score):
+        solution[s] = 1
+
+    # drop the sets whose items are all covered by the other picked sets
+    solution = remove_redundant_sets(instance, solution)
+
     # calculate the cost of the solution
     obj = sum([s.cost*solution[s.index] for s in sets])
 
@@ -0,0 +1,19 @@
+#include <stdlib.h>
+
+#include "types.h"
+#include "functions.h"
+
+/* releases all the memory allocated for the sets and the element-value-table of the problem */
+void free_problem(struct problem* specific_problem) {
+	
+	for (int i = 0; i < specific_problem->number_of_sets; ++i) {
+		free(specific_problem->sets[i].elements->data);
+		free(specific_problem->sets[i].elements);
+	}
+	free(specific_problem->sets);
+	
+	for (int i = 0; i < specific_problem->number_of_elements; ++i)
+		free(specific_problem->element_value_table[i].data);
+	free(specific_problem->element_value_table);
+	
+}
\ No newline at end of file
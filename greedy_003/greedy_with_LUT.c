@@ -40,8 +40,7 @@ void greedy_with_LUT(const char* path, char** output) {
 	
 	// free resources
 	free(solution_string);
-	free(specific_problem.element_value_table);
-	free(specific_problem.sets);
+	free_problem(&specific_problem);
 	free(specific_solution.mask_of_picked_sets);
 	
 }
\ No newline at end of file
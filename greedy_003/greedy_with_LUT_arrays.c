@@ -0,0 +1,28 @@
+#include <stdlib.h>
+
+#include "types.h"
+#include "functions.h"
+
+/* entry point for in-process callers (e.g. Python via ctypes): solves the problem given as flat arrays,
+   writes 0/1 for every set to the caller-allocated `mask_of_picked_sets' and returns the cost of the cover */
+double greedy_with_LUT_arrays(int number_of_elements, int number_of_sets, const double* costs, const long long* offsets, const int* elements, int* mask_of_picked_sets) {
+	
+	struct problem specific_problem;
+	struct solution specific_solution;
+	
+	// create sets and element-value-table from the arrays
+	read_problem_description_from_arrays(number_of_elements, number_of_sets, costs, offsets, elements, &specific_problem);
+	
+	// solve problem
+	greedy_with_LUT_core(&specific_problem, &specific_solution);
+	
+	// copy result to the caller's buffer
+	for (int i = 0; i < number_of_sets; ++i)
+		mask_of_picked_sets[i] = specific_solution.mask_of_picked_sets[i];
+	
+	// free resources: the caller may solve thousands of problems in the same process
+	free_problem(&specific_problem);
+	free(specific_solution.mask_of_picked_sets);
+	
+	return specific_solution.cost;
+}
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+In-process binding of the C greedy solver (see README.md) via ctypes.
+
+The instance arrays are passed to C as they are, so there is neither process
+spawn nor file round trip: callers like LNS loops can run the greedy
+thousands of times. Build the shared library first:
+
+    gcc -O2 -shared -fPIC -o libgreedy_with_LUT.so greedy_with_LUT_arrays.c greedy_with_LUT_core.c read_problem_description_from_arrays.c free_problem.c find_most_cost_efficient_set.c remove_element_from_all_sets.c dynamic_array_element.c dynamic_array_index_pair.c
+"""
+import ctypes
+import os
+import sys
+
+import numpy as np
+
+LIBRARY_NAME = 'greedy_with_LUT.dll' if sys.platform == 'win32' else 'libgreedy_with_LUT.so'
+LIBRARY_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), LIBRARY_NAME)
+
+_library = None
+
+
+def load_library(path=LIBRARY_PATH):
+    global _library
+    if _library is None:
+        if not os.path.exists(path):
+            raise OSError('{} not found. Build it as described in greedy_003/README.md'.format(path))
+        library = ctypes.CDLL(path)
+        library.greedy_with_LUT_arrays.restype = ctypes.c_double
+        library.greedy_with_LUT_arrays.argtypes = [
+            ctypes.c_int,                                                 # number_of_elements
+            ctypes.c_int,                                                 # number_of_sets
+            np.ctypeslib.ndpointer(np.float64, flags='C_CONTIGUOUS'),     # costs
+            np.ctypeslib.ndpointer(np.int64, flags='C_CONTIGUOUS'),       # offsets
+            np.ctypeslib.ndpointer(np.intc, flags='C_CONTIGUOUS'),        # elements
+            np.ctypeslib.ndpointer(np.intc, flags='C_CONTIGUOUS,WRITEABLE'),  # mask_of_picked_sets
+        ]
+        _library = library
+    return _library
+
+
+def greedy(instance):
+    """
+    Run the C greedy on an instance.
+    :param common.instance.Instance instance:
+    :return np.ndarray: 0/1 for every set
+    """
+    # The C code loops forever if some item can't be covered, so check it here
+    if instance.item_count and np.count_nonzero(np.bincount(instance.items, minlength=instance.item_count)) < instance.item_count:
+        raise ValueError('Some items are not covered by any set')
+
+    mask = np.zeros(instance.set_count, dtype=np.intc)
+    load_library().greedy_with_LUT_arrays(
+        instance.item_count,
+        instance.set_count,
+        np.ascontiguousarray(instance.costs, dtype=np.float64),
+        np.ascontiguousarray(instance.offsets, dtype=np.int64),
+        np.ascontiguousarray(instance.items, dtype=np.intc),
+        mask)
+    return mask
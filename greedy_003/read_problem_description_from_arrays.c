@@ -0,0 +1,69 @@
+#include <stdlib.h>
+
+#include "types.h"
+#include "functions.h"
+
+/* fills `problem' data type from an instance given as flat arrays (costs, offsets of the sets in `elements', elements) */
+void read_problem_description_from_arrays(int number_of_elements, int number_of_sets, const double* costs, const long long* offsets, const int* elements, struct problem* specific_problem) {
+	
+	specific_problem->number_of_sets = number_of_sets;
+	specific_problem->number_of_elements = number_of_elements;
+	
+	// initialize with largest float (normal) number
+	specific_problem->minimum_efficiency = (float) 0x7f7fffff;
+	specific_problem->minimum_efficiency_set_index = 0;
+	
+	// allocate and initialize set array
+	specific_problem->sets = calloc(number_of_sets, sizeof(struct set));
+	for (int i = 0; i < number_of_sets; ++i) {
+		specific_problem->sets[i].index_of_root_element = 0;
+		specific_problem->sets[i].elements = malloc(sizeof(struct dynamic_array_element));
+		initialize_element(specific_problem->sets[i].elements);
+	}
+	
+	// allocate and initialize element-value-table
+	specific_problem->element_value_table = calloc(number_of_elements, sizeof(struct dynamic_array_index_pair));
+	for (int i = 0; i < number_of_elements; ++i)
+		initialize(&(specific_problem->element_value_table[i]));
+	
+	for (int set_index = 0; set_index < number_of_sets; ++set_index) {
+		
+		struct set* current_set = &(specific_problem->sets[set_index]);
+		int number_of_set_elements = (int) (offsets[set_index + 1] - offsets[set_index]);
+		
+		current_set->cost = (float) costs[set_index];
+		
+		for (int element_index = 0; element_index < number_of_set_elements; ++element_index) {
+			
+			int element_value = elements[offsets[set_index] + element_index];
+			
+			// add entry to element-value-table
+			struct index_pair element_value_table_entry;
+			element_value_table_entry.set_index = set_index;
+			element_value_table_entry.element_index = element_index;
+			(specific_problem->element_value_table[element_value]).add(element_value_table_entry, &(specific_problem->element_value_table[element_value]));
+			
+			// add element to set
+			struct element _element;
+			_element.value = element_value;
+			_element.index_previous = element_index - 1;
+			_element.index_next = (element_index + 1 < number_of_set_elements) ? element_index + 1 : -1;
+			current_set->elements->add(_element, current_set->elements);
+		}
+		
+		current_set->number_of_elements = number_of_set_elements;
+		
+		// special case: empty set has no root element
+		if (number_of_set_elements == 0)
+			current_set->index_of_root_element = -1;
+		
+		current_set->efficiency = current_set->cost / current_set->number_of_elements;
+		
+		// identify most cost efficient set index
+		if (current_set->efficiency < specific_problem->minimum_efficiency) {
+			specific_problem->minimum_efficiency_set_index = set_index;
+			specific_problem->minimum_efficiency = current_set->efficiency;
+		}
+	}
+	
+}
\ No newline at end of file
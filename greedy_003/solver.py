@@ -0,0 +1,42 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Runs the C greedy in-process through lut_greedy.py.
+# Build libgreedy_with_LUT.so (or greedy_with_LUT.dll) first, see README.md.
+
+from __future__ import print_function
+
+import os
+import sys
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.instance import parse_input
+from common.postopt import remove_redundant_sets
+from lut_greedy import greedy
+
+
+def solve_it(input_data):
+    instance = parse_input(input_data)
+    solution = greedy(instance)
+
+    # drop the sets whose items are all covered by the other picked sets
+    solution = remove_redundant_sets(instance, solution)
+
+    # calculate the cost of the solution
+    obj = sum(cost for cost, taken in zip(instance.costs.tolist(), solution) if taken)
+
+    # prepare the solution in the specified output format
+    output_data = str(obj) + ' ' + str(0) + '\n'
+    output_data += ' '.join(map(str, solution))
+
+    return output_data
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        file_location = sys.argv[1].strip()
+        with open(file_location, 'r') as input_data_file:
+            input_data = input_data_file.read()
+        print('Solving:', file_location)
+        print(solve_it(input_data))
+    else:
+        print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/sc_6_1)')
@@ -10,11 +10,14 @@ On my computer this yields solutions that suffice for getting a 10
 in under 15 minutes.
 """
 
-import random
+import os
 import sys
 import gurobipy as grb
 import mip as m
 
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.neighborhoods import AdaptiveNeighborhoods
+
 # Time limit per MIP call in s
 TIMELIMIT = 2.5 * 60
 # Ratio of unused nodes to exclude
@@ -26,8 +29,8 @@ def large_neighborhood(model):
   Solves a set cover instance with large-neighborhood search.
 
   In each call to the MIP solver we exclude a fixed ratio of the sets that
-  are currently unused. (Maybe I should favor excluding
-  the sets with the highest cost/size ratio?)
+  are currently unused. Which sets are kept is decided by one of the
+  operators of common/neighborhoods.py, picked by its recent success.
 
   Args:
     model: The set cover MIP model as created by mip.create_model().
@@ -46,41 +49,39 @@ def large_neighborhood(model):
   g_model.setParam("SolutionLimit", 2147483647)
   
   best_obj = g_model.objval
-  best_sol = {var:int(var.x) for var in vars}
-  obj_constraint = g_model.addConstr(g_model.getObjective() <= best_obj - 1)
+  best_sol = [int(round(x)) for x in g_model.getAttr("X", vars)]
+  neighborhoods = AdaptiveNeighborhoods(g_model._instance)
+  # Only strictly better solutions are interesting. The parameter replaces the objective constraint,
+  # so changing it doesn't modify the model
+  g_model.setParam("Cutoff", best_obj - 1)
   
   if g_model.status != grb.GRB.OPTIMAL:
     while g_model.status != grb.GRB.INTERRUPTED:
-      # Add the additional constraints as described above
-      added_constraints = []
-      for var in vars:
-        if best_sol[var] == 0 and random.random() < FIX_RATIO:
-          added_constraints.append(g_model.addConstr(var == 0))
+      # Exclude the sets as described above: one bulk change of upper bounds instead of a constraint per set
+      free_count = int(round((1 - FIX_RATIO) * (len(best_sol) - sum(best_sol))))
+      operator, fixed = neighborhoods.draw(best_sol, free_count)
+      fixed_vars = [vars[i] for i in fixed]
+      g_model.setAttr("UB", fixed_vars, [0.0] * len(fixed_vars))
 
       g_model.optimize()
 
-      # Remove the additional constraints again
-      for constraint in added_constraints:
-        g_model.remove(constraint)
-
       #print g_model.status
-      if g_model.status != grb.GRB.INFEASIBLE:
-        if g_model.objval < best_obj:
-          print("\nNext solution:    {0}".format(g_model.objval))
-          m.write(model, False)
-
-          best_obj = g_model.objval
-          best_sol = {var:int(var.x) for var in vars}
-
-          g_model.remove(obj_constraint)
-          obj_constraint = g_model.addConstr(g_model.getObjective() <= best_obj - 1)
-        else:
-          print "(ERROR)"
+      neighborhoods.update(operator, g_model.SolCount > 0)
+      if g_model.SolCount > 0:  # with the cutoff any solution is an improvement
+        print("\nNext solution:    {0}".format(g_model.objval))
+        m.write(model, False)
+
+        best_obj = g_model.objval
+        best_sol = [int(round(x)) for x in g_model.getAttr("X", vars)]
+        g_model.setParam("Cutoff", best_obj - 1)
       else:
         sys.stdout.write('.')
         sys.stdout.flush()
 
+      # Free the sets again (after reading the solution, changes of the model discard it)
+      g_model.setAttr("UB", fixed_vars, [1.0] * len(fixed_vars))
 
+  g_model.setParam("Cutoff", float('inf'))
   g_model.setParam("TimeLimit", float('inf'))
   g_model.optimize()
   if g_model.status == grb.GRB.OPTIMAL:
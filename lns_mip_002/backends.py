@@ -0,0 +1,194 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+MIP backends for the large neighborhood search.
+
+The LNS needs only a few operations from a solver: solve the model with some
+sets excluded (fixed to 0), with a time limit and with an objective cutoff,
+so only better solutions are found. A backend wraps one solver behind
+
+  backend.solve(time_limit, excluded=(), cutoff=None, hint=None)
+    -> (status, objective, solution)
+
+and has the attributes name, instance (common/instance.py, the presolved
+one) and reduction (common/presolve.py, to map solutions back). Objectives
+include the cost of the sets fixed by presolve, solutions are 0/1 lists over
+the sets of the presolved instance.
+
+  gurobi -- the model of mip.py, needs a Gurobi license
+  cpsat  -- OR-tools CP-SAT, runs everywhere
+
+The solvers are imported only when their backend is created.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.cache import load_instance
+from common.greedy import lazy_greedy
+from common.postopt import remove_redundant_sets
+from common.presolve import presolve
+
+# Statuses of solve()
+OPTIMAL = 'optimal'          # the best solution of the (restricted) model is found
+FEASIBLE = 'feasible'        # a solution is found, not proven the best
+INFEASIBLE = 'infeasible'    # there is no solution within the cutoff
+UNKNOWN = 'unknown'          # the time limit is hit without a solution
+INTERRUPTED = 'interrupted'  # the user has interrupted the solve (Ctrl-C)
+
+
+class GurobiBackend(object):
+  def __init__(self, filename, threads=None):
+    """
+    Args:
+      filename: The file containing the set cover instance.
+      threads: The count of Gurobi threads (default: as in mip.py).
+    """
+    import gurobipy as grb
+    import mip as m
+    self._grb = grb
+    self.model = m.create_model(m.read(filename))
+    g_model, self.vars = self.model
+    g_model.setParam("OutputFlag", 0)
+    if threads is not None:
+      g_model.setParam("Threads", threads)
+    self.name = g_model.getAttr("ModelName")
+    self.instance = g_model._instance
+    self.reduction = g_model._reduction
+
+  def solve(self, time_limit, excluded=(), cutoff=None, hint=None):
+    # Gurobi finds a start by itself, the hint is not used
+    GRB = self._grb.GRB
+    g_model = self.model[0]
+    g_model.setParam("TimeLimit", time_limit)
+    # The parameter replaces the objective constraint, so changing it doesn't modify the model
+    g_model.setParam("Cutoff", GRB.INFINITY if cutoff is None else cutoff)
+    # One bulk change of upper bounds instead of a constraint per set
+    fixed_vars = [self.vars[i] for i in excluded]
+    g_model.setAttr("UB", fixed_vars, [0.0] * len(fixed_vars))
+
+    g_model.optimize()
+
+    objective, solution = None, None
+    if g_model.status == GRB.INTERRUPTED:
+      status = INTERRUPTED
+    elif g_model.status in (GRB.INFEASIBLE, GRB.CUTOFF):
+      status = INFEASIBLE
+    elif g_model.status == GRB.OPTIMAL:
+      status = OPTIMAL
+    elif g_model.SolCount > 0:
+      status = FEASIBLE
+    else:
+      status = UNKNOWN
+    if g_model.SolCount > 0:  # with the cutoff any solution is an improvement
+      objective = g_model.objval
+      solution = [int(round(x)) for x in g_model.getAttr("X", self.vars)]
+
+    # Free the sets again (after reading the solution, changes of the model discard it)
+    g_model.setAttr("UB", fixed_vars, [1.0] * len(fixed_vars))
+    return status, objective, solution
+
+
+class CpSatBackend(object):
+  def __init__(self, filename, threads=None):
+    """
+    Args:
+      filename: The file containing the set cover instance.
+      threads: The count of CP-SAT workers (default: its own default).
+    """
+    from ortools.sat.python import cp_model
+    self._cp_model = cp_model
+    self.name = os.path.basename(filename)
+    self.instance, self.reduction = presolve(load_instance(filename))
+    self.threads = threads
+    instance = self.instance
+
+    # The same model as in cp_ortools_001, CP-SAT needs integral costs
+    self.model = cp_model.CpModel()
+    self.vars = [self.model.NewBoolVar("s_{0}".format(i)) for i in range(instance.set_count)]
+    covered_by = [[] for i in range(instance.item_count)]
+    for s in range(instance.set_count):
+      for item in instance.items[instance.offsets[s]:instance.offsets[s + 1]].tolist():
+        covered_by[item].append(self.vars[s])
+    for item in range(instance.item_count):
+      self.model.AddBoolOr(covered_by[item])
+    costs = [int(c) for c in instance.costs.tolist()]
+    objective = sum(c * x for c, x in zip(costs, self.vars))
+    self.model.Minimize(objective)
+    # The cutoff is the upper bound of this constraint, solve() changes it in the proto
+    self._cutoff_index = self.model.Add(objective <= sum(costs)).Index()
+
+    # Start from the greedy cover, until a better hint is given
+    solution = [0] * instance.set_count
+    for s in lazy_greedy(instance):
+      solution[s] = 1
+    self._set_hint(remove_redundant_sets(instance, solution))
+
+  def _set_hint(self, hint):
+    self.model.ClearHints()
+    for x, value in zip(self.vars, hint):
+      self.model.AddHint(x, int(value))
+
+  def solve(self, time_limit, excluded=(), cutoff=None, hint=None):
+    cp_model = self._cp_model
+    proto = self.model.Proto()
+    if hint is not None:
+      self._set_hint(hint)
+    # Exclude the sets by the upper bounds of their domains, so the model is not rebuilt
+    for i in excluded:
+      proto.variables[i].domain[1] = 0
+    fixed_cost = self.reduction.fixed_cost
+    cutoff_domain = proto.constraints[self._cutoff_index].linear.domain
+    cutoff_domain[1] = int(sum(self.instance.costs) if cutoff is None else cutoff - fixed_cost)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.catch_sigint_signal = False  # Ctrl-C must stop the LNS, not only this solve
+    if self.threads is not None:
+      solver.parameters.num_search_workers = self.threads
+    try:
+      cp_status = solver.Solve(self.model)
+    except KeyboardInterrupt:
+      cp_status = None
+    finally:
+      for i in excluded:
+        proto.variables[i].domain[1] = 1
+
+    objective, solution = None, None
+    if cp_status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+      status = OPTIMAL if cp_status == cp_model.OPTIMAL else FEASIBLE
+      objective = solver.ObjectiveValue() + fixed_cost
+      solution = [int(solver.Value(x)) for x in self.vars]
+    elif cp_status is None:
+      status = INTERRUPTED
+    elif cp_status == cp_model.INFEASIBLE:
+      status = INFEASIBLE
+    elif cp_status == cp_model.UNKNOWN:
+      status = UNKNOWN
+    else:
+      raise RuntimeError("CP-SAT: {0}".format(solver.StatusName(cp_status)))
+    return status, objective, solution
+
+
+BACKENDS = {'gurobi': GurobiBackend, 'cpsat': CpSatBackend}
+
+
+def default_backend():
+  """gurobi if it can be imported, otherwise cpsat"""
+  try:
+    import gurobipy
+  except ImportError:
+    return 'cpsat'
+  return 'gurobi'
+
+
+def create_backend(filename, kind=None, threads=None):
+  """
+  Args:
+    filename: The file containing the set cover instance.
+    kind: A key of BACKENDS (default: default_backend()).
+    threads: The count of solver threads (default: the solver's default).
+  """
+  return BACKENDS[kind or default_backend()](filename, threads)
@@ -4,78 +4,109 @@
 """
 Large neighborhood search for set cover based on a MIP solver.
 
-Includes an adaptive neighborhood size.
+Includes an adaptive neighborhood size and adaptive neighborhood operators
+(see common/neighborhoods.py). The solver is one of the backends of
+backends.py, Gurobi or OR-tools CP-SAT.
+
+Usage: python lns.py <instance> [gurobi|cpsat]
 """
 
-import random
+import os
 import sys
-import gurobipy as grb
-import mip as m
+import time
+import backends as b
+
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.greedy import lazy_greedy
+from common.neighborhoods import AdaptiveNeighborhoods
+from common.postopt import remove_redundant_sets
+from common.presolve import postsolve
+from common.sinks import format_solution
+from common.solutions import file_key
+
+
+def write(backend, objective, solution, is_optimal=False):
+  """Writes a solution of the presolved instance as the solution of the original one to <name>.sol"""
+  with open(backend.name + ".sol", "w") as file:
+    file.write(format_solution(objective, postsolve(backend.reduction, solution), is_optimal))
+    file.write("\n")
 
-def large_neighborhood(model):
+
+def large_neighborhood(backend, time_limit=None, sink=None, start=None):
   """
   Solves a set cover instance with large-neighborhood search.
 
   In each call to the MIP solver we exclude a fixed ratio of the sets that
-  are currently unused.
+  are currently unused. The operator, that chooses the sets to keep, is
+  picked by its recent success.
 
   Args:
-    model: The set cover MIP model as created by mip.create_model().
+    backend: The solver of the set cover model as created by backends.create_backend().
+    time_limit: Total time limit in s (default: until interrupted).
+    sink: A callable(obj, solution), that gets every improving solution of the
+      original instance (see common/sinks.py). By default they are written to <name>.sol.
+    start: A 0/1 cover of the presolved instance, the hint of the first solve (CP-SAT only).
+
+  Returns:
+    A triple of the cost, the 0/1 solution of the original instance and whether it is
+    proven optimal, or None if nothing was found.
   """
   # Time limit per MIP call in s
   TIMELIMIT = 3
   # Ratio of unused nodes to exclude
   FIX_RATIO = 0.9
-  
+
   SAMPLE_SIZE = 30
   FEASIBLE_COUNT = 0
   INFEASIBLE_COUNT = 0
 
 
-  g_model, vars = model
-  g_model.setParam("OutputFlag", 0)
-  g_model.setParam("TimeLimit", len(vars)*0.05)
+  deadline = time.time() + time_limit if time_limit is not None else None
 
-  print("Processing " + g_model.getAttr("ModelName"))
+  def report(objective, solution, is_optimal=False):
+    if sink is None:
+      write(backend, objective, solution, is_optimal)
+    else:
+      sink(objective, postsolve(backend.reduction, solution))
+
+  print("Processing " + backend.name)
 
   # Warmup
-  g_model.optimize()
-  print("Initial solution: {0}".format(g_model.objval))
-  m.write(model)
-  #g_model.setParam("SolutionLimit", 2147483647)
-  g_model.setParam("TimeLimit", TIMELIMIT)
-  
-  best_obj = g_model.objval
-  best_sol = {var:int(var.x) for var in vars}
-  obj_constraint = g_model.addConstr(g_model.getObjective() <= best_obj - 1)
-  
-  if g_model.status != grb.GRB.OPTIMAL:
-    while g_model.status != grb.GRB.INTERRUPTED:
-      # Add the additional constraints as described above
-      added_constraints = []
-      for var in vars:
-        if best_sol[var] == 0 and random.random() < FIX_RATIO:
-          added_constraints.append(g_model.addConstr(var == best_sol[var]))
-
-      g_model.optimize()
-
-      # Remove the additional constraints again
-      for constraint in added_constraints:
-        g_model.remove(constraint)
-
-      #print g_model.status
-      if g_model.status != grb.GRB.INFEASIBLE:
+  warmup = backend.instance.set_count*0.05
+  if deadline is not None:
+    warmup = min(warmup, time_limit)
+  status, best_obj, best_sol = backend.solve(warmup, hint=start)
+  print("Initial solution: {0}".format(best_obj))
+  if best_sol is None:  # interrupted or out of time before the first solution
+    return None
+  # Only the warmup solves the full model, an optimal sub-MIP proves nothing about the instance
+  is_optimal = status == b.OPTIMAL
+  report(best_obj, best_sol, is_optimal)
+
+  neighborhoods = AdaptiveNeighborhoods(backend.instance)
+
+  if not is_optimal and status != b.INTERRUPTED:
+    while status != b.INTERRUPTED:
+      if deadline is not None and time.time() >= deadline:
+        break
+      free_count = int(round((1 - FIX_RATIO) * (len(best_sol) - sum(best_sol))))
+      operator, fixed = neighborhoods.draw(best_sol, free_count)
+
+      # Only strictly better solutions are interesting
+      time_left = TIMELIMIT if deadline is None else min(TIMELIMIT, deadline - time.time())
+      status, objective, solution = backend.solve(time_left, fixed, best_obj - 1, best_sol)
+
+      neighborhoods.update(operator, solution is not None)
+      if solution is not None:  # with the cutoff any solution is an improvement
+        sys.stdout.write("\nNext solution:    {0}\n".format(objective))
+        best_obj, best_sol = objective, solution
+        report(best_obj, best_sol)
+      if status == b.INTERRUPTED:
+        break
+
+      if status != b.INFEASIBLE:  # otherwise it has no better solution
         FEASIBLE_COUNT += 1;
-        if g_model.objval < best_obj:
-          sys.stdout.write("\nNext solution:    {0}\n".format(g_model.objval))
-          m.write(model, False)
-
-          best_obj = g_model.objval
-          best_sol = {var:int(var.x) for var in vars}
-
-          g_model.remove(obj_constraint)
-          obj_constraint = g_model.addConstr(g_model.getObjective() <= best_obj - 1)
-
+        if solution is not None:
           FEASIBLE_COUNT = 0
           INFEASIBLE_COUNT = 0
         else:
@@ -95,11 +126,25 @@ def large_neighborhood(model):
         FEASIBLE_COUNT = 0
         INFEASIBLE_COUNT = 0
 
-  #g_model.setParam("TimeLimit", float('inf'))
-  #g_model.optimize()
-  #if g_model.status == grb.GRB.OPTIMAL:
-  #  print("Optimal solution: {0}".format(g_model.objval))
-  m.write(model)
+  return best_obj, postsolve(backend.reduction, best_sol), is_optimal
+
+def solve_file(path, time_limit=None, sink=None, kind=None, store=None):
+  """
+  Runs large_neighborhood() on a new backend (see backends.create_backend()) of the instance file.
+
+  Args:
+    store: A common.solutions.SolutionStore, the search starts from its best known solution.
+  """
+  backend = b.create_backend(path, kind)
+  start = None
+  if store is not None:
+    initial = store.warm_start(file_key(path), backend.reduction)
+    if initial:
+      start = [0] * backend.instance.set_count
+      for s in lazy_greedy(backend.instance, initial=initial):
+        start[s] = 1
+      start = remove_redundant_sets(backend.instance, start)
+  return large_neighborhood(backend, time_limit, sink, start)
 
 if __name__ == "__main__":
-  large_neighborhood(m.create_model(m.read(sys.argv[1])))
+  large_neighborhood(b.create_backend(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
@@ -15,26 +15,33 @@ import sys
 import os.path
 import gurobipy as grb
 
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.cache import load_instance
+from common.instance import to_sets
+from common.presolve import postsolve, presolve
 
-def read(filename):
+
+def read(filename, reduce=True):
   """
   Reads a set cover instance.
 
   Args:
     filename: The file containing the set cover instance.
+    reduce: Presolve the instance (see common/presolve.py)? (default: Yes)
 
   Returns:
-    A triple consisting of the instance name, the number of items n
-    and the list of subsets of N := {0, ..., n - 1}. Each subset U
-    is a pair of the subset cost and the list of elements in U.
+    A tuple consisting of the instance name, the number of items n,
+    the list of subsets of N := {0, ..., n - 1}, the presolve reduction
+    (None if the instance is not reduced) and the instance in the CSR form
+    of common/instance.py. Each subset U is a pair of the subset cost and
+    the list of elements in U.
   """
-  with open(filename) as file:
-    nitems, nsets = (int(x) for x in file.readline().split())
-    sets = []
-    for _ in range(nsets):
-      line = file.readline().split()
-      sets.append((float(line[0]), [int(x) for x in line[1:]]))
-    return os.path.basename(filename), nitems, sets
+  instance = load_instance(filename)
+  reduction = None
+  if reduce:
+    instance, reduction = presolve(instance)
+  sets = [(s.cost, s.items) for s in to_sets(instance)]
+  return os.path.basename(filename), instance.item_count, sets, reduction, instance
 
 
 def create_model(instance):
@@ -52,8 +59,10 @@ def create_model(instance):
     A pair of the Gurobi MIP model and the mapping from the sets
     in the instance to the corresponding Gurobi variables.
   """
-  name, nitems, sets = instance
+  name, nitems, sets, reduction, csr = instance
   model = grb.Model(name)
+  model._reduction = reduction  # user data, needed to write the solution of the original instance
+  model._instance = csr  # user data, the neighborhoods of the LNS are built on it
 
   # One variable for each set. Also remember which sets cover each item.
   covered_by = [[] for i in range(nitems)]
@@ -72,6 +81,8 @@ def create_model(instance):
 
   # We want to minimize. Objective coefficients already fixed during variable creation.
   model.setAttr("ModelSense", grb.GRB.MINIMIZE)
+  if reduction is not None:
+    model.setAttr("ObjCon", reduction.fixed_cost)  # so objval is the cost of the original solution
 
   # Tuning parameters derived from sc_330_0
   model.read("mip.prm")
@@ -94,10 +105,13 @@ def write(model, original=True):
     original: Is this still the original model? (default: Yes)
   """
   g_model, vars = model
+  solution = [int(round(var.x)) for var in vars]
+  if g_model._reduction is not None:
+    solution = postsolve(g_model._reduction, solution)
   with open(g_model.getAttr("ModelName") + ".sol", "w") as file:
     file.write("{0} {1}\n".format(g_model.objval, int(original and g_model.status == grb.GRB.status.OPTIMAL)))
-    for var in vars:
-      file.write("{0} ".format(int(var.x)))
+    for x in solution:
+      file.write("{0} ".format(x))
     file.write("\n")
 
 if __name__ == "__main__":
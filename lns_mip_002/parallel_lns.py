@@ -0,0 +1,146 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Parallel large neighborhood search for set cover based on a MIP solver.
+
+lns.py explores one neighborhood at a time with a few solver threads.
+Sub-MIPs of small neighborhoods hardly profit from more threads, so here
+every worker process owns its own single-threaded backend (see backends.py) and
+several neighborhoods are explored at the same time. The driver keeps the
+incumbent: every result, that is better, replaces it, and the next
+neighborhoods are drawn around the new incumbent, by the operators of
+common/neighborhoods.py, that have been successful recently.
+
+Usage: python parallel_lns.py <instance> [workers] [minutes] [gurobi|cpsat]
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+import backends as b
+
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.cache import load_instance
+from common.greedy import lazy_greedy
+from common.neighborhoods import AdaptiveNeighborhoods
+from common.postopt import remove_redundant_sets
+from common.presolve import postsolve, presolve
+from common.sinks import FileSink
+
+# Time limit per MIP call in s
+TIMELIMIT = 5
+# Ratios of unused sets to exclude. Every worker gets the next one, so the neighborhoods differ in size
+FIX_RATIOS = [0.95, 0.9, 0.85, 0.8]
+# How often the driver checks the workers, in s
+POLL_INTERVAL = 0.05
+
+# The backend of the worker process, see _init_worker()
+_backend = None
+
+
+def _init_worker(filename, kind):
+  global _backend
+  _backend = b.create_backend(filename, kind, threads=1)  # the parallelism comes from the processes
+
+
+def _explore(task):
+  """
+  Solves the sub-MIP of one neighborhood in the worker process.
+
+  Args:
+    task: A tuple of the indexes of the excluded sets, the cost of the
+      incumbent (only better solutions are interesting), the incumbent and
+      the deadline of the whole search (time.time() of the driver).
+
+  Returns:
+    A pair of the objective and the 0/1 solution, or None if nothing better was found.
+  """
+  fixed, best_obj, best_sol, deadline = task
+  time_left = min(TIMELIMIT, deadline - time.time())
+  if time_left <= 0:
+    return None
+  status, objective, solution = _backend.solve(time_left, fixed, best_obj - 1, best_sol)
+  if solution is None:
+    return None
+  return objective, solution  # with the cutoff any solution is an improvement
+
+
+def parallel_neighborhood(filename, workers=None, minutes=10, kind=None):
+  """
+  Solves a set cover instance with parallel large-neighborhood search.
+
+  Args:
+    filename: The file containing the set cover instance.
+    workers: The count of worker processes (default: one per CPU).
+    minutes: Total time limit.
+    kind: The backend, a key of backends.BACKENDS (default: backends.default_backend()).
+
+  Returns:
+    A pair of the cost and the 0/1 solution of the original instance.
+  """
+  workers = workers or multiprocessing.cpu_count()
+  deadline = time.time() + 60 * minutes
+  kind = kind or b.default_backend()  # the same one in every worker
+
+  # The workers read and presolve the instance the same way, so the sets are numbered the same.
+  # Objectives include the cost of the sets fixed by presolve, as the ones of the backends do
+  instance, reduction = presolve(load_instance(filename))
+  sink = FileSink(os.path.basename(filename) + ".sol")
+
+  # Start from the greedy cover, the MIP has to improve it anyway
+  best_sol = [0] * instance.set_count
+  for s in lazy_greedy(instance):
+    best_sol[s] = 1
+  best_sol = remove_redundant_sets(instance, best_sol)
+  best_obj = sum(c for c, x in zip(instance.costs.tolist(), best_sol) if x) + reduction.fixed_cost
+  print("Initial solution: {0}".format(best_obj))
+  sink(best_obj, postsolve(reduction, best_sol))
+  neighborhoods = AdaptiveNeighborhoods(instance, best_obj - reduction.fixed_cost)
+
+  pool = multiprocessing.Pool(workers, _init_worker, (filename, kind))
+  pending = []  # [(operator, AsyncResult)]
+  counter = 0
+  try:
+    while True:
+      # Keep every worker busy with a neighborhood of the current incumbent
+      while len(pending) < workers and time.time() < deadline:
+        free_count = int(round((1 - FIX_RATIOS[counter % len(FIX_RATIOS)]) * (len(best_sol) - sum(best_sol))))
+        operator, fixed = neighborhoods.draw(best_sol, free_count)
+        pending.append((operator, pool.apply_async(_explore, ((fixed, best_obj, best_sol, deadline),))))
+        counter += 1
+      if not pending:
+        break
+
+      done = [task for task in pending if task[1].ready()]
+      if not done:
+        time.sleep(POLL_INTERVAL)
+        continue
+      for task in done:
+        pending.remove(task)
+        operator, r = task
+        result = r.get()  # raises, if the worker has failed
+        improved = result is not None and result[0] < best_obj  # a late result may be worse than the incumbent
+        neighborhoods.update(operator, improved)
+        if improved:
+          best_obj, best_sol = result
+          sys.stdout.write("\nNext solution:    {0}\n".format(best_obj))
+          sink(best_obj, postsolve(reduction, best_sol))
+        else:
+          sys.stdout.write('.')
+      sys.stdout.flush()
+  except KeyboardInterrupt:
+    pool.terminate()
+  else:
+    pool.close()
+  pool.join()
+  return best_obj, postsolve(reduction, best_sol)
+
+
+if __name__ == "__main__":
+  workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+  minutes = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+  kind = sys.argv[4] if len(sys.argv) > 4 else None
+  parallel_neighborhood(sys.argv[1], workers, minutes, kind)
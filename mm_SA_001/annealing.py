@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Simulated annealing for set cover, the algorithm of setCoversa.cpp in-process.
+
+The state is a selection of sets, that may miss some items; a missed item
+costs a penalty. A move either toggles one set or swaps a chosen set for an
+unused one, it is accepted with the probability 1 / (1 + exp(delta / T)).
+
+The state keeps a cover count per item, the count of missed items and the
+cost, so the delta of a move and the move itself only touch the items of the
+sets involved, not the whole matrix as the dense C++ version does. The hot
+loop works on Python lists: indexing them is much faster than NumPy scalars.
+"""
+import math
+import random
+import time
+from collections import namedtuple
+
+from common.greedy import lazy_greedy
+from common.postopt import remove_redundant_sets
+
+# The temperature starts at ``start`` (None: the penalty of a missed item) and is multiplied
+# by ``cooling`` after every ``moves`` moves. At ``end`` it restarts from the best cover
+Schedule = namedtuple('Schedule', ['start', 'end', 'cooling', 'moves'])
+DEFAULT_SCHEDULE = Schedule(start=None, end=0.1, cooling=0.98, moves=2000)
+# Probability of a toggle move, otherwise it is a swap
+TOGGLE_PROBABILITY = 0.6
+# Penalty of a missed item per the highest set cost
+PENALTY_FACTOR = 4
+
+
+class Annealer(object):
+    def __init__(self, instance, solution, seed=None):
+        """
+        :param common.instance.Instance instance:
+        :param list[1|0] solution: the start, not necessarily a cover
+        :param seed: seed of the random generator
+        """
+        self.set_count = instance.set_count
+        self.costs = instance.costs.tolist()
+        self.offsets = instance.offsets.tolist()
+        self.items = instance.items.tolist()
+        self.penalty = PENALTY_FACTOR * max(self.costs)
+        self.rng = random.Random(seed)
+
+        self.selected = [False] * self.set_count
+        self.chosen = []  # the selected sets, for a random choice in O(1)
+        self.position = [-1] * self.set_count  # index of a set in chosen
+        self.cover_count = [0] * instance.item_count
+        self.missed = instance.item_count
+        self.cost = 0
+        self._stamp = [0] * instance.item_count  # marks of the items of a set, see swap_delta()
+        self._stamp_counter = 0
+        for s, x in enumerate(solution):
+            if x:
+                self.toggle(s)
+
+    def set_items(self, s):
+        return self.items[self.offsets[s]:self.offsets[s + 1]]
+
+    def toggle_delta(self, s):
+        """Change of the score by toggling the set s"""
+        cover_count = self.cover_count
+        if self.selected[s]:
+            return self.penalty * sum(1 for i in self.set_items(s) if cover_count[i] == 1) - self.costs[s]
+        return self.costs[s] - self.penalty * sum(1 for i in self.set_items(s) if cover_count[i] == 0)
+
+    def toggle(self, s):
+        cover_count = self.cover_count
+        if self.selected[s]:
+            for i in self.set_items(s):
+                cover_count[i] -= 1
+                if cover_count[i] == 0:
+                    self.missed += 1
+            self.cost -= self.costs[s]
+            # Remove from chosen: move the last one to its place
+            last = self.chosen.pop()
+            if last != s:
+                self.chosen[self.position[s]] = last
+                self.position[last] = self.position[s]
+            self.position[s] = -1
+        else:
+            for i in self.set_items(s):
+                if cover_count[i] == 0:
+                    self.missed -= 1
+                cover_count[i] += 1
+            self.cost += self.costs[s]
+            self.position[s] = len(self.chosen)
+            self.chosen.append(s)
+        self.selected[s] = not self.selected[s]
+
+    def swap_delta(self, out_set, in_set):
+        """Change of the score by replacing the chosen out_set by the unused in_set"""
+        cover_count = self.cover_count
+        self._stamp_counter += 1
+        stamp, mark = self._stamp, self._stamp_counter
+        in_items = self.set_items(in_set)
+        for i in in_items:
+            stamp[i] = mark
+        lost = sum(1 for i in self.set_items(out_set) if cover_count[i] == 1 and stamp[i] != mark)
+
+        self._stamp_counter += 1
+        mark = self._stamp_counter
+        for i in self.set_items(out_set):
+            stamp[i] = mark
+        gained = sum(1 for i in in_items if cover_count[i] == 0 and stamp[i] != mark)
+        return self.costs[in_set] - self.costs[out_set] + self.penalty * (lost - gained)
+
+    def swap(self, out_set, in_set):
+        self.toggle(in_set)
+        self.toggle(out_set)
+
+    def run(self, time_limit, schedule=DEFAULT_SCHEDULE, sink=None):
+        """
+        Anneal until the time is over.
+        :param float time_limit: in s
+        :param Schedule schedule:
+        :param sink: callable(obj, solution), gets the improving covers (see common/sinks.py)
+        :return (float, list[1|0]): the best cover found and its cost, (None, None) if there is none
+        """
+        deadline = time.time() + time_limit
+        rng = self.rng
+        start_temperature = self.penalty if schedule.start is None else schedule.start
+        best_cost, best_solution = None, None
+        if self.missed == 0:
+            best_cost, best_solution = self.cost, [int(x) for x in self.selected]
+
+        temperature = start_temperature
+        while time.time() < deadline:
+            improved = False
+            for _ in range(schedule.moves):
+                chosen_count = len(self.chosen)
+                if rng.random() < TOGGLE_PROBABILITY or chosen_count == 0 or chosen_count == self.set_count:
+                    out_set, in_set = None, rng.randrange(self.set_count)
+                    delta = self.toggle_delta(in_set)
+                else:
+                    out_set = self.chosen[rng.randrange(chosen_count)]
+                    in_set = rng.randrange(self.set_count)
+                    while self.selected[in_set]:
+                        in_set = rng.randrange(self.set_count)
+                    delta = self.swap_delta(out_set, in_set)
+
+                if delta < 0 or rng.random() < _acceptance(delta, temperature):
+                    if out_set is None:
+                        self.toggle(in_set)
+                    else:
+                        self.swap(out_set, in_set)
+                    if self.missed == 0 and (best_cost is None or self.cost < best_cost):
+                        best_cost, best_solution = self.cost, [int(x) for x in self.selected]
+                        improved = True
+
+            if improved and sink is not None:
+                sink(best_cost, best_solution)
+            temperature *= schedule.cooling
+            if temperature < schedule.end and best_solution is not None:
+                # Reheat from the best cover, while there is time left
+                for s, x in enumerate(best_solution):
+                    if self.selected[s] != bool(x):
+                        self.toggle(s)
+                temperature = start_temperature
+        return best_cost, best_solution
+
+
+def _acceptance(delta, temperature):
+    exponent = delta / temperature
+    if exponent > 50:
+        return 0.0  # exp() would overflow
+    return 1.0 / (1.0 + math.exp(exponent))
+
+
+def anneal(instance, time_limit=60, schedule=DEFAULT_SCHEDULE, seed=None, sink=None, initial=()):
+    """
+    Start from the greedy cover and anneal it.
+    :param common.instance.Instance instance:
+    :param float time_limit: in s
+    :param Schedule schedule:
+    :param seed: seed of the random generator
+    :param sink: callable(obj, solution), gets the improving covers (see common/sinks.py)
+    :param list[int] initial: sets the greedy cover starts with, e.g. of the best known solution
+    :return (float, list[1|0]): cost and the best cover
+    """
+    solution = [0] * instance.set_count
+    for s in lazy_greedy(instance, initial=initial):
+        solution[s] = 1
+    solution = remove_redundant_sets(instance, solution)
+    annealer = Annealer(instance, solution, seed)
+    cost, solution = annealer.run(time_limit, schedule, sink)
+    solution = remove_redundant_sets(instance, solution)
+    return sum(c for c, x in zip(instance.costs.tolist(), solution) if x), solution
@@ -4,47 +4,78 @@
 # -------------------------------------------------------------------------------
 #    HOW TO USE THIS SOLVER:
 # -------------------------------------------------------------------------------
-# 
-# Compile the C++ code setCoversa.cpp into an executable setCoversa
-#   Linux: g++ setCoversa.cpp -O3 -o setCoversa
-# Run this accompanying solver.py script 
-#   python solver.py ./data/sc_25_0
-# 
-# If you want the solver to think longer, you can increase MAXREPS in SimAnn() 
+#
+# Run this solver.py script
+#   python solver.py ./data/sc_25_0 [seconds] [file to keep the best solution so far in] [--store]
+#
+# The simulated annealing of annealing.py runs in-process. It is the algorithm of
+# setCoversa.cpp, which is kept for reference. If you want the solver to think
+# longer, increase the seconds (TIME_LIMIT by default), the temperature schedule
+# is annealing.DEFAULT_SCHEDULE
+#
+# With --store it starts from the best known solution of common/solutions.py and
+# records its improvements there.
 
 import os
-from subprocess import Popen, PIPE
-
-def solve_it(input_data):
+import sys
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from annealing import anneal
+from common.instance import parse_input
+from common.presolve import postsolve, presolve
+from common.sinks import FileSink, PostsolveSink, StoreSink, TeeSink
+from common.solutions import SolutionStore, gap, instance_key
 
-    # Writes the inputData to a temporay file
+# Time budget in s
+TIME_LIMIT = 60
 
-    tmp_file_name = 'tmp.data'
-    tmp_file = open(tmp_file_name, 'w')
-    tmp_file.write(input_data)
-    tmp_file.close()
 
-    # Runs the command: java Solver -file=tmp.data
+def solve_it(input_data, time_limit=TIME_LIMIT, sink=None, store=None):
+    """
+    :param sink: callable(obj, solution), gets every improving solution of the original instance,
+        e.g. common.sinks.FileSink
+    :param common.solutions.SolutionStore store: start from the best known solution and record the improvements
+    """
+    # parse the input and reduce it (see common/presolve.py), presolve removes the dominated
+    # sets, as checkCols() of setCoversa.cpp does
+    original = parse_input(input_data)
+    instance, reduction = presolve(original)
+    initial = []
+    if store is not None:
+        key = instance_key(input_data)
+        initial = store.warm_start(key, reduction)
+        sink = TeeSink(sink, StoreSink(store, key, original))
 
-    process = Popen(['setCoversa'], stdout=PIPE)
-    (stdout, stderr) = process.communicate()
+    if instance.item_count > 0:
+        obj, solution = anneal(instance, time_limit, initial=initial,
+                               sink=PostsolveSink(sink, reduction) if sink is not None else None)
+    else:  # presolve has fixed everything
+        obj, solution = 0, []
+    obj += reduction.fixed_cost
+    solution = postsolve(reduction, solution)
+    if store is not None:
+        store.record(key, original, obj, solution)
 
-    # removes the temporay file
-    os.remove(tmp_file_name)
+    output_data = str(obj) + ' 0\n'
+    output_data += ' '.join(map(str, solution))
 
-    return stdout.strip()
+    return output_data
 
 
-import sys
-
 if __name__ == '__main__':
-    if len(sys.argv) > 1:
-        file_location = sys.argv[1].strip()
-        input_data_file = open(file_location, 'r')
-        input_data = ''.join(input_data_file.readlines())
-        input_data_file.close()
-        print 'Solving:', file_location
-        print solve_it(input_data)
+    # --store anywhere on the command line: start from and record to the solution store
+    argv = [arg for arg in sys.argv if arg != '--store']
+    if len(argv) > 1:
+        file_location = argv[1].strip()
+        with open(file_location, 'r') as input_data_file:
+            input_data = input_data_file.read()
+        time_limit = float(argv[2]) if len(argv) > 2 else TIME_LIMIT
+        sink = FileSink(argv[3].strip()) if len(argv) > 3 else None
+        store = SolutionStore() if len(argv) < len(sys.argv) else None
+        best = store.best_objective(instance_key(input_data)) if store is not None else None
+        print('Solving: ' + file_location)
+        output_data = solve_it(input_data, time_limit, sink, store)
+        print(output_data)
+        if best is not None:
+            print('Gap to the best known {}: {:.2%}'.format(best, gap(float(output_data.split()[0]), best)))
     else:
-        print 'This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/sc_6_1)'
-
+        print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/sc_6_1)')
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# -------------------------------------------------------------------------------
+#    HOW TO USE THIS SOLVER:
+# -------------------------------------------------------------------------------
+#
+# Run this solver.py script
+#   python solver.py ./data/sc_25_0 [seconds] [solvers] [file to keep the best solution so far in] [--store]
+#
+# It races the solvers (comma separated directory names, common.portfolio.DEFAULT_SOLVERS
+# by default) in parallel processes, see common/portfolio.py, and returns the best cover
+# found before the time (TIME_LIMIT by default) is over or the first proven optimum.
+# With --store the solvers start from the best known solution of common/solutions.py,
+# and the best cover of the race is recorded there.
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.portfolio import DEFAULT_SOLVERS, race
+from common.sinks import FileSink
+from common.solutions import SolutionStore, gap, instance_key
+
+# Time budget in s
+TIME_LIMIT = 60
+
+
+def solve_it(input_data, time_limit=TIME_LIMIT, solvers=DEFAULT_SOLVERS, sink=None, store=None):
+    """
+    :param sink: callable(obj, solution), gets every improvement of the best cover, e.g. common.sinks.FileSink
+    :param common.solutions.SolutionStore store: start from the best known solution and record the best cover
+    """
+    # Some solvers read the instance file themselves
+    fd, path = tempfile.mkstemp(suffix='.data')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(input_data)
+        result = race(path, solvers, time_limit, sink, store=store)
+    finally:
+        os.remove(path)
+    for name, error in sorted(result.errors.items()):
+        sys.stderr.write('{} failed:\n{}\n'.format(name, error))
+    if result.solution is None:
+        raise RuntimeError('no solver has found a cover in {} s'.format(time_limit))
+
+    output_data = str(result.obj) + ' ' + str(int(result.is_optimal)) + '\n'
+    output_data += ' '.join(map(str, result.solution))
+
+    return output_data
+
+
+if __name__ == '__main__':
+    # --store anywhere on the command line: start from and record to the solution store
+    argv = [arg for arg in sys.argv if arg != '--store']
+    if len(argv) > 1:
+        file_location = argv[1].strip()
+        with open(file_location, 'r') as input_data_file:
+            input_data = input_data_file.read()
+        time_limit = float(argv[2]) if len(argv) > 2 else TIME_LIMIT
+        solvers = argv[3].strip().split(',') if len(argv) > 3 else DEFAULT_SOLVERS
+        sink = FileSink(argv[4].strip()) if len(argv) > 4 else None
+        store = SolutionStore() if len(argv) < len(sys.argv) else None
+        best = store.best_objective(instance_key(input_data)) if store is not None else None
+        print('Solving: ' + file_location)
+        output_data = solve_it(input_data, time_limit, solvers, sink, store)
+        print(output_data)
+        if best is not None:
+            print('Gap to the best known {}: {:.2%}'.format(best, gap(float(output_data.split()[0]), best)))
+    else:
+        print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/sc_6_1)')
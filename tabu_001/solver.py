@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# -------------------------------------------------------------------------------
+#    HOW TO USE THIS SOLVER:
+# -------------------------------------------------------------------------------
+#
+# Run this solver.py script
+#   python solver.py ./data/sc_25_0 [seconds] [file to keep the best solution so far in] [--store]
+#
+# It builds the greedy cover and improves it by the tabu search of
+# common/localsearch.py until the time (TIME_LIMIT by default) is over.
+#
+# With --store it starts from the best known solution of common/solutions.py and
+# records its improvements there.
+
+import os
+import sys
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, '../..')))
+from common.greedy import lazy_greedy
+from common.instance import parse_input
+from common.localsearch import improve
+from common.postopt import remove_redundant_sets
+from common.presolve import postsolve, presolve
+from common.sinks import FileSink, PostsolveSink, StoreSink, TeeSink
+from common.solutions import SolutionStore, gap, instance_key
+
+# Time budget in s
+TIME_LIMIT = 60
+
+
+def solve_it(input_data, time_limit=TIME_LIMIT, sink=None, store=None):
+    """
+    :param sink: callable(obj, solution), gets every improving solution of the original instance,
+        e.g. common.sinks.FileSink
+    :param common.solutions.SolutionStore store: start from the best known solution and record the improvements
+    """
+    # parse the input and reduce it (see common/presolve.py)
+    original = parse_input(input_data)
+    instance, reduction = presolve(original)
+    initial = []
+    if store is not None:
+        key = instance_key(input_data)
+        initial = store.warm_start(key, reduction)
+        sink = TeeSink(sink, StoreSink(store, key, original))
+
+    if instance.item_count > 0:
+        # the greedy cover, or the best known one, completed by the greedy if presolve has removed some of its sets
+        solution = [0] * instance.set_count
+        for s in lazy_greedy(instance, initial=initial):
+            solution[s] = 1
+        solution = remove_redundant_sets(instance, solution)
+        obj, solution = improve(instance, solution, time_limit,
+                                sink=PostsolveSink(sink, reduction) if sink is not None else None)
+    else:  # presolve has fixed everything
+        obj, solution = 0, []
+    obj += reduction.fixed_cost
+    solution = postsolve(reduction, solution)
+    if store is not None:
+        store.record(key, original, obj, solution)
+
+    output_data = str(obj) + ' 0\n'
+    output_data += ' '.join(map(str, solution))
+
+    return output_data
+
+
+if __name__ == '__main__':
+    # --store anywhere on the command line: start from and record to the solution store
+    argv = [arg for arg in sys.argv if arg != '--store']
+    if len(argv) > 1:
+        file_location = argv[1].strip()
+        with open(file_location, 'r') as input_data_file:
+            input_data = input_data_file.read()
+        time_limit = float(argv[2]) if len(argv) > 2 else TIME_LIMIT
+        sink = FileSink(argv[3].strip()) if len(argv) > 3 else None
+        store = SolutionStore() if len(argv) < len(sys.argv) else None
+        best = store.best_objective(instance_key(input_data)) if store is not None else None
+        print('Solving: ' + file_location)
+        output_data = solve_it(input_data, time_limit, sink, store)
+        print(output_data)
+        if best is not None:
+            print('Gap to the best known {}: {:.2%}'.format(best, gap(float(output_data.split()[0]), best)))
+    else:
+        print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/sc_6_1)')